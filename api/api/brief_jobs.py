@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import time
+
+import psycopg
+from or_shared.events import RUN_COMPLETED_CHANNEL
+
+from api.brief_store import load_brief, prune_briefs
+from api.db import close_pool, conn, open_pool
+from api.routes.briefs import render_brief
+from api.settings import get_settings
+
+log = logging.getLogger(__name__)
+
+async def prerender(run):
+    """Render briefs for every region alerting at BRIEF_PRERENDER_SEVERITY or above in `run`.
+
+    Those are the briefs NGOs pull right after a run; any other region is
+    rendered on first request and cached from then on. A region that fails to
+    render (ReportLab error, full disk) is logged and left to that on-demand
+    path; losing the database connection still propagates to main().
+    """
+    s = get_settings()
+    async with conn() as c, c.cursor() as cur:
+        await cur.execute("SELECT DISTINCT region_id FROM alerts WHERE run_id=%s AND created_utc >= %s AND severity >= %s",
+                          (run[0], run[2], s.brief_prerender_severity))
+        region_ids = [r[0] for r in await cur.fetchall()]
+        await cur.execute("SELECT id FROM runs ORDER BY run_time_utc DESC LIMIT %s", (s.brief_keep_runs,))
+        keep = [r[0] for r in await cur.fetchall()]
+    start = time.perf_counter()
+    rendered = failed = 0
+    for region_id in region_ids:
+        try:
+            if await asyncio.to_thread(load_brief, run[0], region_id) is None:
+                await render_brief(run, region_id)
+                rendered += 1
+        except psycopg.OperationalError:
+            raise
+        except Exception:
+            failed += 1
+            log.exception("brief render failed run=%s region=%s", run[1], region_id)
+    try:
+        dropped = await asyncio.to_thread(prune_briefs, keep)
+    except OSError:
+        dropped = 0
+        log.exception("brief prune failed run=%s", run[1])
+    print(f"OK briefs run={run[1]} rendered={rendered}/{len(region_ids)} failed={failed} "
+          f"in {time.perf_counter() - start:.1f}s pruned_runs={dropped}")
+
+async def latest_run():
+    async with conn() as c, c.cursor() as cur:
+        await cur.execute("SELECT id, run_id, run_time_utc FROM runs ORDER BY run_time_utc DESC LIMIT 1")
+        return await cur.fetchone()
+
+async def main():
+    """Pre-render briefs for the latest run, then again after each worker run."""
+    s = get_settings()
+    await open_pool()
+    try:
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(s.postgres_url, autocommit=True) as c:
+                    await c.execute(f"LISTEN {RUN_COMPLETED_CHANNEL}")
+                    # catch up on a run that finished while we were not listening
+                    if run := await latest_run():
+                        await prerender(run)
+                    async for _ in c.notifies():
+                        if run := await latest_run():
+                            await prerender(run)
+            except psycopg.OperationalError:
+                log.warning("brief job lost its database connection; retrying", exc_info=True)
+                await asyncio.sleep(5)
+    finally:
+        await close_pool()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from api.settings import get_settings
+
+# Bump whenever render_pdf output changes so stale files and ETags are not reused.
+BRIEF_FORMAT = 2
+
+def brief_key(run_db_id, region_id) -> str:
+    """Content address of a brief: it depends only on the run and the region."""
+    return hashlib.sha256(f"{BRIEF_FORMAT}:{run_db_id}:{region_id}".encode()).hexdigest()[:32]
+
+def brief_etag(run_db_id, region_id) -> str:
+    return f'"{brief_key(run_db_id, region_id)}"'
+
+def etag_matches(if_none_match, etag) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+def _path(run_db_id, region_id) -> Path:
+    # one directory per run so superseded runs are dropped with a single rmtree
+    return Path(get_settings().brief_cache_dir) / str(run_db_id) / f"{brief_key(run_db_id, region_id)}.pdf"
+
+def load_brief(run_db_id, region_id) -> bytes | None:
+    try:
+        return _path(run_db_id, region_id).read_bytes()
+    except FileNotFoundError:
+        return None
+
+def store_brief(run_db_id, region_id, pdf: bytes):
+    """Write atomically, so concurrent readers see either nothing or the whole file."""
+    p = _path(run_db_id, region_id)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=p.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(pdf)
+    os.replace(tmp, p)
+
+def prune_briefs(keep_run_ids):
+    """Remove the cached briefs of every run not in keep_run_ids."""
+    root = Path(get_settings().brief_cache_dir)
+    if not root.is_dir():
+        return []
+    keep = {str(r) for r in keep_run_ids}
+    dropped = [d.name for d in root.iterdir() if d.is_dir() and d.name not in keep]
+    for name in dropped:
+        shutil.rmtree(root / name, ignore_errors=True)
+    return dropped
@@ -1,8 +1,35 @@
-import psycopg
-from api.settings import Settings
-
-def conn():
-    s=Settings()
-    c=psycopg.connect(s.postgres_url)
-    c.autocommit=True
-    return c
+from contextlib import asynccontextmanager
+from psycopg_pool import AsyncConnectionPool
+from api.settings import get_settings
+
+_pool: AsyncConnectionPool | None = None
+
+async def open_pool() -> AsyncConnectionPool:
+    global _pool
+    if _pool is None:
+        s = get_settings()
+        _pool = AsyncConnectionPool(
+            s.postgres_url, name="api",
+            min_size=s.db_pool_min, max_size=s.db_pool_max,
+            timeout=s.db_pool_timeout_sec, max_idle=s.db_pool_max_idle_sec,
+            check=AsyncConnectionPool.check_connection if s.db_pool_check else None,
+            kwargs={"autocommit": True}, open=False,
+        )
+        await _pool.open()
+    return _pool
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+@asynccontextmanager
+async def conn():
+    """Borrow an autocommit connection from the app pool: `async with conn() as c: ...`."""
+    pool = await open_pool()
+    async with pool.connection() as c:
+        yield c
+
+async def pool_stats() -> dict:
+    return (await open_pool()).get_stats()
@@ -1,5 +1,10 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
+from api.db import open_pool, close_pool
+from api.redis_client import redis_pool, close_redis
 from api.middleware import RateLimitMiddleware
+from api.run_cache import listen_for_runs
 from api.routes.health import router as health
 from api.routes.runs import router as runs
 from api.routes.indicators import router as indicators
@@ -7,9 +12,23 @@ from api.routes.alerts import router as alerts
 from api.routes.reports import router as reports
 from api.routes.subscriptions import router as subs
 from api.routes.exports import router as exports
-from api.routes.briefs import router as briefs
+from api.routes.briefs import router as briefs, close_render_pool
+from api.routes.tiles import router as tiles
 
-app = FastAPI(title="OpenResilience API", version="0.3.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await open_pool()
+    redis_pool()
+    listener = asyncio.create_task(listen_for_runs())
+    yield
+    listener.cancel()
+    with suppress(asyncio.CancelledError):
+        await listener
+    await close_pool()
+    await close_redis()
+    close_render_pool()
+
+app = FastAPI(title="OpenResilience API", version="0.3.0", lifespan=lifespan)
 app.add_middleware(RateLimitMiddleware)
 
 app.include_router(health, prefix="/health")
@@ -20,3 +39,4 @@ app.include_router(reports, prefix="/reports")
 app.include_router(subs, prefix="/subscriptions")
 app.include_router(exports, prefix="/exports")
 app.include_router(briefs, prefix="/briefs")
+app.include_router(tiles, prefix="/tiles")
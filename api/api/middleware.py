@@ -1,18 +1,119 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
 from fastapi import Request
+from or_shared.rate_limit import token_bucket_allow_async, token_bucket_consume_many_async
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
+
 from api.redis_client import rconn
-from or_shared.rate_limit import token_bucket_allow
-from api.settings import Settings
+from api.settings import get_settings
+
+log = logging.getLogger(__name__)
+
+class LocalBuckets:
+    """Per-process token buckets, reconciled with the shared Redis buckets in batches.
+
+    Decisions are made in memory. Every `sync_sec` the tokens granted since the
+    last sync are deducted from the Redis buckets in one pipelined round trip and
+    each local bucket is reset to the global balance Redis reports, so traffic
+    seen by other replicas catches up within one interval. While Redis is
+    unreachable the local buckets keep deciding on their own and the unsynced
+    grants are retried. Buckets are kept in LRU order and capped at `max_keys`.
+    """
+
+    def __init__(self, capacity, refill_per_sec, max_keys, sync_sec):
+        self.capacity = float(capacity)
+        self.refill_per_sec = refill_per_sec
+        self.max_keys = max_keys
+        self.sync_sec = sync_sec
+        self.buckets = OrderedDict()  # key -> [tokens, ts, granted since last sync]
+        self.evicted = {}             # key -> unsynced grants of evicted buckets
+        self.last_sync = time.time()
+        self.task = None
+
+    def allow(self, key, now):
+        b = self.buckets.get(key)
+        if b is None:
+            b = self.buckets[key] = [self.capacity, now, 0]
+            if len(self.buckets) > self.max_keys:
+                old_key, old = self.buckets.popitem(last=False)
+                if old[2]:
+                    self.evicted[old_key] = self.evicted.get(old_key, 0) + old[2]
+        else:
+            self.buckets.move_to_end(key)
+        tokens = min(self.capacity, b[0] + (now - b[1]) * self.refill_per_sec)
+        b[1] = now
+        if tokens >= 1.0:
+            b[0] = tokens - 1.0
+            b[2] += 1
+            return True
+        b[0] = tokens
+        return False
+
+    def maybe_sync(self, now):
+        if (self.task is None or self.task.done()) and now - self.last_sync >= self.sync_sec:
+            self.last_sync = now
+            self.task = asyncio.create_task(self.sync())
+
+    async def sync(self):
+        batch = self.evicted
+        self.evicted = {}
+        for k, b in self.buckets.items():
+            if b[2]:
+                batch[k] = batch.get(k, 0) + b[2]
+                b[2] = 0
+        if not batch:
+            return
+        try:
+            balances = await token_bucket_consume_many_async(rconn(), batch, self.capacity, self.refill_per_sec)
+        except Exception:
+            log.warning("rate limit sync failed; deciding locally until Redis is back", exc_info=True)
+            for k, n in batch.items():
+                if k in self.buckets:
+                    self.buckets[k][2] += n
+                else:
+                    self.evicted[k] = self.evicted.get(k, 0) + n
+            return
+        now = time.time()
+        for k, balance in balances.items():
+            b = self.buckets.get(k)
+            if b is not None:
+                # grants made while the sync was in flight are still pending
+                b[0] = min(self.capacity, balance - b[2])
+                b[1] = now
+
+_local: LocalBuckets | None = None
+
+def local_buckets() -> LocalBuckets:
+    global _local
+    if _local is None:
+        s = get_settings()
+        _local = LocalBuckets(s.rate_limit_per_minute, s.rate_limit_per_minute / 60.0,
+                              s.rate_limit_local_max_keys, s.rate_limit_sync_sec)
+    return _local
+
+def is_exempt(path, exempt_paths):
+    return any(path == p or path.startswith(p.rstrip("/") + "/") for p in exempt_paths)
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
-        s = Settings()
-        r = rconn()
+        s = get_settings()
+        if is_exempt(request.url.path, s.rate_limit_exempt_paths):
+            return await call_next(request)
         ip = request.client.host if request.client else "unknown"
         key = f"rl:ip:{ip}"
-        cap = s.rate_limit_per_minute
-        refill = cap / 60.0
-        if not token_bucket_allow(r, key, capacity=cap, refill_per_sec=refill):
+        if s.rate_limit_local:
+            lb = local_buckets()
+            now = time.time()
+            allowed = lb.allow(key, now)
+            lb.maybe_sync(now)
+        else:
+            cap = s.rate_limit_per_minute
+            refill = cap / 60.0
+            allowed = await token_bucket_allow_async(rconn(), key, capacity=cap, refill_per_sec=refill)
+        if not allowed:
             return Response("Too Many Requests", status_code=429)
         return await call_next(request)
@@ -1,6 +1,35 @@
-import redis
-from api.settings import Settings
+import redis.asyncio as redis
+from api.settings import get_settings
+
+_pool: redis.BlockingConnectionPool | None = None
+
+def redis_pool() -> redis.BlockingConnectionPool:
+    global _pool
+    if _pool is None:
+        s = get_settings()
+        # Blocking: callers wait up to redis_pool_timeout_sec for a free
+        # connection instead of failing once the pool is exhausted
+        _pool = redis.BlockingConnectionPool.from_url(
+            s.redis_url, decode_responses=True,
+            max_connections=s.redis_pool_max, timeout=s.redis_pool_timeout_sec,
+            health_check_interval=s.redis_health_check_sec,
+        )
+    return _pool
+
+async def close_redis():
+    global _pool
+    if _pool is not None:
+        await _pool.disconnect()
+        _pool = None
 
 def rconn():
-    s=Settings()
-    return redis.Redis.from_url(s.redis_url, decode_responses=True)
+    """Non-blocking Redis client sharing the app-lifetime connection pool."""
+    return redis.Redis(connection_pool=redis_pool())
+
+def redis_pool_stats() -> dict:
+    p = redis_pool()
+    return {
+        "max_connections": p.max_connections,
+        "available": len(getattr(p, "_available_connections", [])),
+        "in_use": len(getattr(p, "_in_use_connections", [])),
+    }
@@ -1,35 +1,43 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
 from api.db import conn
+from api.run_cache import run_cache
+from api.spatial import bbox_filter
 
 router = APIRouter()
 
 @router.get("/latest")
-def latest(severity_min: int=2, limit: int=200,
-           min_lat: float | None=None, max_lat: float | None=None, min_lon: float | None=None, max_lon: float | None=None):
-    with conn().cursor() as cur:
-        cur.execute("SELECT id, run_id, run_time_utc FROM runs ORDER BY run_time_utc DESC LIMIT 1")
-        run = cur.fetchone()
-        if not run:
-            raise HTTPException(status_code=404, detail="No runs yet")
-        run_db_id = run[0]
-        where = "WHERE a.run_id=%s AND a.severity >= %s"
-        params = [run_db_id, severity_min]
-        if None not in (min_lat, max_lat, min_lon, max_lon):
-            where += " AND r.lat BETWEEN %s AND %s AND r.lon BETWEEN %s AND %s"
-            params += [min_lat, max_lat, min_lon, max_lon]
-        q = f"""
-        SELECT a.region_id, a.domain, a.severity, a.title, a.message, a.details,
-               a.valid_start_utc, a.valid_end_utc, a.created_utc,
-               r.lat, r.lon, r.admin0, r.admin1, r.admin2
-        FROM alerts a
-        LEFT JOIN regions r ON r.region_id = a.region_id
-        {where}
-        ORDER BY a.severity DESC, a.created_utc DESC
-        LIMIT %s
-        """
-        params.append(limit)
-        cur.execute(q, params)
-        rows = cur.fetchall()
+async def latest(severity_min: int=2, limit: int=200,
+                 min_lat: float | None=None, max_lat: float | None=None, min_lon: float | None=None, max_lon: float | None=None):
+    bbox = (min_lat, max_lat, min_lon, max_lon)
+    body = await run_cache().get_json("alerts.latest", (severity_min, limit, bbox),
+                                      lambda run: latest_alerts(run, severity_min, limit, bbox))
+    if body is None:
+        raise HTTPException(status_code=404, detail="No runs yet")
+    return Response(body, media_type="application/json")
+
+async def latest_alerts(run, severity_min, limit, bbox, half_open=False):
+    # created_utc bound lets Postgres prune every older alerts partition
+    where = "WHERE a.run_id=%s AND a.created_utc >= %s AND a.severity >= %s"
+    params = [run[0], run[2], severity_min]
+    if None not in bbox:
+        sql, bbox_params = bbox_filter(bbox, half_open=half_open)
+        where += sql
+        params += bbox_params
+    q = f"""
+    SELECT a.region_id, a.domain, a.severity, a.title, a.message, a.details,
+           a.valid_start_utc, a.valid_end_utc, a.created_utc,
+           r.lat, r.lon, r.admin0, r.admin1, r.admin2
+    FROM alerts a
+    LEFT JOIN regions r ON r.region_id = a.region_id
+    {where}
+    ORDER BY a.severity DESC, a.created_utc DESC
+    LIMIT %s
+    """
+    params.append(limit)
+    async with conn() as c, c.cursor() as cur:
+        await cur.execute(q, params)
+        rows = await cur.fetchall()
     return {
         "run_id": run[1],
         "alerts": [{
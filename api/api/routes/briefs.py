@@ -1,39 +1,184 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import Response
+import asyncio
+import json
+import logging
+import multiprocessing
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, model_validator
+from starlette.concurrency import run_in_threadpool
 from api.db import conn
+from api.run_cache import run_cache
+from api.settings import get_settings
+from api.spatial import bbox_filter
+from api.streams import ChunkSink
+from api.brief_store import brief_etag, etag_matches, load_brief, store_brief
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from io import BytesIO
 
 router = APIRouter()
+log = logging.getLogger(__name__)
 
-def get_latest_metrics(region_id: str):
-    with conn().cursor() as cur:
-        cur.execute("SELECT id FROM runs ORDER BY run_time_utc DESC LIMIT 1")
-        run = cur.fetchone()
-        if not run:
-            raise HTTPException(status_code=404, detail="No runs")
-        cur.execute(
-            "SELECT metric, value, severity, confidence, updated_utc FROM indicators "
-            "WHERE region_id=%s AND metric IN ('wsi','fsi','msi','cri') ORDER BY updated_utc DESC",
-            (region_id,)
-        )
-        ind = cur.fetchall()
-        cur.execute(
+class BatchIn(BaseModel):
+    region_ids: list[str] | None = None
+    bbox: tuple[float, float, float, float] | None = None  # min_lat, max_lat, min_lon, max_lon
+
+    @model_validator(mode="after")
+    def one_selector(self):
+        if (self.region_ids is None) == (self.bbox is None):
+            raise ValueError("give exactly one of region_ids or bbox")
+        return self
+
+REGION_LATEST = """
+SELECT r.region_id, r.lat, r.lon, r.admin0, r.admin1, r.admin2,
+       l.confidence, l.updated_utc, l.wsi, l.fsi, l.msi, l.cri
+FROM regions r
+LEFT JOIN latest_indicators l ON l.region_id = r.region_id
+"""
+
+def latest_metric_rows(row):
+    """(metric, value, severity, confidence, updated_utc) rows of a REGION_LATEST row."""
+    conf, ts = row[6], row[7]
+    if ts is None:
+        return []
+    return [(m, float(v), v, conf, ts) for m, v in zip(("wsi", "fsi", "msi", "cri"), row[8:12])]
+
+async def get_latest_metrics(region_id: str):
+    async with conn() as c, c.cursor() as cur:
+        await cur.execute(REGION_LATEST + "WHERE r.region_id=%s", (region_id,))
+        row = await cur.fetchone()
+        if not row:
+            return None, [], []
+        await cur.execute(
             "SELECT domain, severity, title, message, created_utc FROM alerts "
             "WHERE region_id=%s ORDER BY created_utc DESC LIMIT 10",
             (region_id,)
         )
-        alerts = cur.fetchall()
-        cur.execute("SELECT lat, lon, admin0, admin1, admin2 FROM regions WHERE region_id=%s", (region_id,))
-        reg = cur.fetchone()
-    return reg, ind, alerts
+        alerts = await cur.fetchall()
+    return row[1:6], latest_metric_rows(row), alerts
+
+async def region_exists(region_id: str) -> bool:
+    async with conn() as c, c.cursor() as cur:
+        await cur.execute("SELECT 1 FROM regions WHERE region_id=%s", (region_id,))
+        return await cur.fetchone() is not None
 
 @router.get("/region/{region_id}.pdf")
-def region_pdf(region_id: str):
-    reg, ind, alerts = get_latest_metrics(region_id)
+async def region_pdf(region_id: str, request: Request):
+    run = await run_cache().latest_run()
+    if run is None:
+        raise HTTPException(status_code=404, detail="No runs")
+    # briefs only change with the run, so the ETag is known before any I/O
+    headers = {"ETag": brief_etag(run[0], region_id), "Cache-Control": "public, no-cache"}
+    # If-None-Match: * matches any ETag, so confirm the region before a 304;
+    # an unknown one falls through to the 404 below
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]) and await region_exists(region_id):
+        return Response(status_code=304, headers=headers)
+    pdf = await run_in_threadpool(load_brief, run[0], region_id)
+    if pdf is None:
+        pdf = await render_brief(run, region_id)
+        if pdf is None:
+            raise HTTPException(status_code=404, detail="Unknown region")
+    return Response(content=pdf, media_type="application/pdf", headers=headers)
+
+async def render_brief(run, region_id) -> bytes | None:
+    """Render and store the brief of `region_id` for `run`; None for an unknown region."""
+    reg, ind, alerts = await get_latest_metrics(region_id)
     if not reg:
-        raise HTTPException(status_code=404, detail="Unknown region")
+        return None
+    # reportlab is CPU-bound; keep it off the event loop
+    pdf = await run_in_threadpool(render_pdf, region_id, reg, ind, alerts)
+    await run_in_threadpool(store_brief, run[0], region_id, pdf)
+    return pdf
+
+_pool: ProcessPoolExecutor | None = None
+
+def render_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that already runs threads is unsafe
+        _pool = ProcessPoolExecutor(max_workers=get_settings().brief_render_processes or None,
+                                    mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+def close_render_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+async def get_batch_metrics(body: BatchIn):
+    """Set-based get_latest_metrics: {region_id: (reg, ind, alerts)} for the whole batch in two queries."""
+    s = get_settings()
+    if body.region_ids is not None:
+        where, params = "WHERE r.region_id = ANY(%s)", [body.region_ids]
+    else:
+        sql, params = bbox_filter(body.bbox)
+        where = "WHERE true" + sql
+    async with conn() as c, c.cursor() as cur:
+        await cur.execute(REGION_LATEST + where + " ORDER BY r.region_id LIMIT %s", params + [s.brief_batch_max + 1])
+        rows = await cur.fetchall()
+        if len(rows) > s.brief_batch_max:
+            raise HTTPException(status_code=413, detail=f"Batch exceeds {s.brief_batch_max} regions")
+        # per-region top 10 off idx_alerts_region
+        await cur.execute(
+            "SELECT ids.region_id, a.domain, a.severity, a.title, a.message, a.created_utc "
+            "FROM unnest(%s::text[]) AS ids(region_id) CROSS JOIN LATERAL ("
+            " SELECT domain, severity, title, message, created_utc FROM alerts"
+            " WHERE region_id = ids.region_id ORDER BY created_utc DESC LIMIT 10) a",
+            ([r[0] for r in rows],))
+        alerts = {}
+        for r in await cur.fetchall():
+            alerts.setdefault(r[0], []).append(r[1:])
+    return {r[0]: (r[1:6], latest_metric_rows(r), alerts.get(r[0], [])) for r in rows}
+
+async def stream_bundle(run, metrics):
+    """Zip stored briefs as-is and render the rest across the process pool, streaming each as it is ready.
+
+    Ends with manifest.json holding the bundle's counts and generation time.
+    """
+    start = time.perf_counter()
+    sink = ChunkSink()
+    zf = zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED)  # PDFs are already compressed
+    loop = asyncio.get_running_loop()
+
+    async def build(region_id, reg, ind, alerts):
+        pdf = await run_in_threadpool(load_brief, run[0], region_id)
+        if pdf is not None:
+            return region_id, pdf, False
+        pdf = await loop.run_in_executor(render_pool(), render_pdf, region_id, reg, ind, alerts)
+        await run_in_threadpool(store_brief, run[0], region_id, pdf)
+        return region_id, pdf, True
+
+    rendered = 0
+    for done in asyncio.as_completed([build(rid, *m) for rid, m in metrics.items()]):
+        region_id, pdf, fresh = await done
+        rendered += fresh
+        zf.writestr(f"{region_id}.pdf", pdf)
+        yield sink.drain()
+    elapsed = time.perf_counter() - start
+    manifest = {"run_id": run[1], "regions": len(metrics), "rendered": rendered,
+                "cached": len(metrics) - rendered, "generation_sec": round(elapsed, 3)}
+    zf.writestr("manifest.json", json.dumps(manifest, indent=2))
+    zf.close()
+    log.info("brief bundle %s", manifest)
+    yield sink.drain()
+
+@router.post("/batch")
+async def batch(body: BatchIn):
+    """ZIP of the latest-run briefs for a list of regions or a bbox."""
+    run = await run_cache().latest_run()
+    if run is None:
+        raise HTTPException(status_code=404, detail="No runs")
+    metrics = await get_batch_metrics(body)
+    if not metrics:
+        raise HTTPException(status_code=404, detail="No matching regions")
+    headers = {"Content-Disposition": f'attachment; filename="briefs-{run[1].replace(":", "")}.zip"'}
+    return StreamingResponse(stream_bundle(run, metrics), media_type="application/zip", headers=headers)
+
+def render_pdf(region_id, reg, ind, alerts) -> bytes:
     buf = BytesIO()
     c = canvas.Canvas(buf, pagesize=letter)
     w, h = letter
@@ -69,4 +214,4 @@ def region_pdf(region_id: str):
     c.setFont("Helvetica-Oblique", 9)
     c.drawString(72, 72, "Disclaimer: probabilistic signals. Verify locally. Do not use as sole basis for travel or enforcement.")
     c.save()
-    return Response(content=buf.getvalue(), media_type="application/pdf")
+    return buf.getvalue()
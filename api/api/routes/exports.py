@@ -1,32 +1,286 @@
-from fastapi import APIRouter
-from fastapi.responses import PlainTextResponse
+from datetime import datetime
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from api.db import conn
-import csv, io
+from api.settings import get_settings
+from api.streams import ChunkSink
+import csv, io, zlib
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 router = APIRouter()
 
-@router.get("/alerts.csv", response_class=PlainTextResponse)
-def alerts_csv(limit: int=5000):
-    with conn().cursor() as cur:
-        cur.execute("SELECT run_id, region_id, domain, severity, title, message, created_utc FROM alerts ORDER BY created_utc DESC LIMIT %s", (limit,))
-        rows = cur.fetchall()
-    out = io.StringIO()
-    w = csv.writer(out)
-    w.writerow(["run_db_id","region_id","domain","severity","title","message","created_utc"])
-    w.writerows(rows)
-    return out.getvalue()
-
-@router.get("/indicators.csv", response_class=PlainTextResponse)
-def indicators_csv(metric: str="cri", limit: int=20000):
-    with conn().cursor() as cur:
-        cur.execute(
-            "SELECT run_id, region_id, metric, value, severity, confidence, updated_utc FROM indicators "
-            "WHERE metric=%s ORDER BY severity DESC, updated_utc DESC LIMIT %s",
-            (metric, limit)
-        )
-        rows = cur.fetchall()
-    out = io.StringIO()
-    w = csv.writer(out)
-    w.writerow(["run_db_id","region_id","metric","value","severity","confidence","updated_utc"])
-    w.writerows(rows)
-    return out.getvalue()
+async def stream_csv(sql, params, header, gzip):
+    """Yield CSV chunks from a server-side cursor, optionally gzip-compressed.
+
+    Rows arrive from Postgres `export_fetch_rows` at a time and are flushed
+    every `export_chunk_bytes`, so memory stays flat whatever the export size.
+    """
+    s = get_settings()
+    z = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(header)
+
+    def flush():
+        data = buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+        return z.compress(data) if z else data
+
+    # named cursors only live inside a transaction
+    async with conn() as c, c.transaction(), c.cursor(name="export") as cur:
+        cur.itersize = s.export_fetch_rows
+        await cur.execute(sql, params)
+        async for row in cur:
+            w.writerow(row)
+            if buf.tell() >= s.export_chunk_bytes:
+                chunk = flush()
+                if chunk:
+                    yield chunk
+    tail = flush()
+    if z:
+        tail += z.flush()
+    if tail:
+        yield tail
+
+def csv_response(name, sql, params, header, gzip):
+    headers = {"Content-Disposition": f'attachment; filename="{name}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(stream_csv(sql, params, header, gzip), media_type="text/csv", headers=headers)
+
+def capped(limit):
+    m = get_settings().export_max_rows
+    return m if limit is None else min(limit, m)
+
+def parse_before(before, *types, name="before"):
+    """Split a keyset cursor: the ordering columns of the last row received, comma-joined."""
+    parts = before.split(",", len(types) - 1)
+    try:
+        return [t(p) for t, p in zip(types, parts, strict=True)]
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Malformed '{name}' cursor")
+
+@router.get("/alerts.csv")
+async def alerts_csv(limit: int=5000, before: str | None=None, gzip: bool=False):
+    """Newest alerts first. For the next page pass before=<created_utc>,<alert_id> of the last row."""
+    where, params = "", []
+    if before:
+        where = "WHERE (created_utc, id) < (%s, %s)"
+        params += parse_before(before, datetime.fromisoformat, int)
+    params.append(capped(limit))
+    sql = ("SELECT run_id, region_id, domain, severity, title, message, created_utc, id FROM alerts "
+           f"{where} ORDER BY created_utc DESC, id DESC LIMIT %s")
+    header = ["run_db_id","region_id","domain","severity","title","message","created_utc","alert_id"]
+    return csv_response("alerts.csv", sql, params, header, gzip)
+
+# Oldest run first, one page of each layout: legacy narrow rows through
+# idx_indicators_run, wide rows through idx_indicators_wide_run, unpivoted
+# only after their LIMIT.
+INDICATOR_RUN_PAGE_SQL = """
+SELECT * FROM (
+  (SELECT run_id, region_id, metric, value, severity, confidence, updated_utc FROM indicators
+   {legacy_where} ORDER BY run_id, region_id LIMIT %s)
+  UNION ALL
+  (SELECT w.run_id, w.region_id, m.metric, m.value, m.severity, r.confidence, w.updated_utc
+   FROM (SELECT * FROM indicators_wide {wide_where} ORDER BY run_id, region_id LIMIT %s) w
+   JOIN runs r ON r.id = w.run_id
+   CROSS JOIN LATERAL (VALUES
+     ('rain_anom', w.rain_anom, 0),
+     ('soil_pct', w.soil_pct, 0),
+     ('ndvi_anom', w.ndvi_anom, 0),
+     ('persistence_wk', w.persistence_wk::real, 0),
+     ('wsi', w.wsi::real, w.wsi::int),
+     ('fsi', w.fsi::real, w.fsi::int),
+     ('msi', w.msi::real, w.msi::int),
+     ('cri', w.cri::real, w.cri::int)
+   ) AS m(metric, value, severity)
+   WHERE m.metric=%s)
+) page
+ORDER BY run_id, region_id LIMIT %s
+"""
+
+@router.get("/indicators.csv")
+async def indicators_csv(metric: str="cri", limit: int=20000, before: str | None=None,
+                         after: str | None=None, gzip: bool=False):
+    """Most severe, then newest first. For the next page pass
+    before=<severity>,<updated_utc>,<region_id> of the last row.
+
+    after=<run_db_id>[,<region_id>] switches to oldest run first, one row per
+    region, starting after that run (or that region of it); pass the last
+    row's run_db_id,region_id for the next page. after=0 starts at the
+    beginning. This order is indexed, so it suits paging through all history.
+    """
+    if before and after:
+        raise HTTPException(status_code=422, detail="Pass either 'before' or 'after', not both")
+    header = ["run_db_id","region_id","metric","value","severity","confidence","updated_utc"]
+    if after:
+        if "," in after:
+            cond, cursor = "(run_id, region_id) > (%s, %s)", parse_before(after, int, str, name="after")
+        else:
+            cond, cursor = "run_id > %s", parse_before(after, int, name="after")
+        n = capped(limit)
+        sql = INDICATOR_RUN_PAGE_SQL.format(legacy_where=where_sql(["metric=%s", cond]), wide_where=where_sql([cond]))
+        return csv_response("indicators.csv", sql, [metric, *cursor, n, *cursor, n, metric, n], header, gzip)
+    where, params = "WHERE metric=%s", [metric]
+    if before:
+        where += " AND (severity, updated_utc, region_id) < (%s, %s, %s)"
+        params += parse_before(before, int, datetime.fromisoformat, str)
+    params.append(capped(limit))
+    sql = ("SELECT run_id, region_id, metric, value, severity, confidence, updated_utc FROM indicator_values "
+           f"{where} ORDER BY severity DESC, updated_utc DESC, region_id DESC LIMIT %s")
+    return csv_response("indicators.csv", sql, params, header, gzip)
+
+# Columnar exports. Column order matches each SELECT below.
+INDICATOR_SCHEMA = pa.schema([
+    ("run_db_id", pa.int64()), ("region_id", pa.string()), ("metric", pa.string()),
+    ("value", pa.float32()), ("severity", pa.int16()), ("confidence", pa.string()),
+    ("updated_utc", pa.timestamp("us")),
+])
+ALERT_SCHEMA = pa.schema([
+    ("alert_id", pa.int64()), ("run_db_id", pa.int64()), ("region_id", pa.string()),
+    ("domain", pa.string()), ("severity", pa.int16()), ("title", pa.string()), ("message", pa.string()),
+    ("valid_start_utc", pa.timestamp("us")), ("valid_end_utc", pa.timestamp("us")), ("created_utc", pa.timestamp("us")),
+])
+# Coarse fields only: no exact coordinates or free text in public outputs (DATA_POLICY.md).
+FIELD_REPORT_SCHEMA = pa.schema([
+    ("report_id", pa.int64()), ("created_utc", pa.timestamp("us")), ("region_id", pa.string()),
+    ("coarse_geohash", pa.string()), ("report_type", pa.string()), ("status", pa.string()),
+    ("trust_score", pa.float32()),
+])
+MEDIA_TYPES = {"parquet": "application/vnd.apache.parquet", "arrow": "application/vnd.apache.arrow.stream"}
+
+def to_batch(rows, schema):
+    cols = list(zip(*rows))
+    return pa.record_batch([pa.array(col, type=f.type) for col, f in zip(cols, schema)], schema=schema)
+
+async def query_rows(sql, params):
+    """Rows of a query from a server-side cursor, `export_fetch_rows` at a time."""
+    async with conn() as c, c.transaction(), c.cursor(name="export") as cur:
+        await cur.execute(sql, params)
+        while rows := await cur.fetchmany(get_settings().export_fetch_rows):
+            yield rows
+
+async def stream_columnar(chunks, schema, fmt):
+    """Yield a Parquet file (one row group per chunk) or an Arrow IPC stream.
+
+    `chunks` yields lists of rows in schema order (e.g. query_rows); each is
+    encoded off the event loop and sent before the next is fetched.
+    """
+    sink = ChunkSink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+    async for rows in chunks:
+        await run_in_threadpool(lambda: writer.write_batch(to_batch(rows, schema)))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+def columnar_response(name, fmt, chunks, schema):
+    headers = {"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+    return StreamingResponse(stream_columnar(chunks, schema, fmt), media_type=MEDIA_TYPES[fmt], headers=headers)
+
+def run_range(where, params, run_from, run_to, col="run_id"):
+    if run_from is not None:
+        where.append(f"{col} >= %s")
+        params.append(run_from)
+    if run_to is not None:
+        where.append(f"{col} <= %s")
+        params.append(run_to)
+
+def where_sql(where):
+    return f"WHERE {' AND '.join(where)}" if where else ""
+
+# indicators_wide metric columns, in the order indicator_values sorts metric names
+WIDE_METRICS = ("cri", "fsi", "msi", "ndvi_anom", "persistence_wk", "rain_anom", "soil_pct", "wsi")
+SEVERITY_METRICS = frozenset(("wsi", "fsi", "msi", "cri"))
+
+def unpivot(rows, metrics, confidence):
+    """(run_id, region_id, updated_utc, *metrics) wide rows to INDICATOR_SCHEMA rows, as indicator_values would."""
+    return [(run_id, region_id, m, v, v if m in SEVERITY_METRICS else 0, confidence.get(run_id), updated)
+            for run_id, region_id, updated, *values in rows for m, v in zip(metrics, values)]
+
+async def indicator_rows(metric, run_from, run_to, limit):
+    """Legacy narrow rows while the range reaches runs stored in `indicators`, then
+    indicators_wide in idx_indicators_wide_run order, unpivoted here.
+
+    Both reads follow an index (idx_indicators_run, idx_indicators_wide_run),
+    so rows stream from the first batch instead of after a sort of all history.
+    """
+    async with conn() as c, c.cursor() as cur:
+        await cur.execute("SELECT max(run_id) FROM indicators")
+        legacy_last = (await cur.fetchone())[0]
+        where, params = [], []
+        run_range(where, params, run_from, run_to, col="id")
+        await cur.execute(f"SELECT id, confidence FROM runs {where_sql(where)}", params)
+        confidence = dict(await cur.fetchall())
+    left = limit
+    if legacy_last is not None and (run_from is None or run_from <= legacy_last):
+        where, params = [], []
+        run_range(where, params, run_from, run_to)
+        if metric:
+            where.append("metric = ANY(%s)")
+            params.append(metric)
+        params.append(left)
+        async for rows in query_rows(
+                "SELECT run_id, region_id, metric, value, severity, confidence, updated_utc FROM indicators "
+                f"{where_sql(where)} ORDER BY run_id, region_id, metric LIMIT %s", params):
+            left -= len(rows)
+            yield rows
+    metrics = [m for m in WIDE_METRICS if not metric or m in metric]
+    if not metrics or left <= 0:
+        return
+    where, params = [], []
+    run_range(where, params, run_from, run_to)
+    params.append(-(-left // len(metrics)))
+    sql = (f"SELECT run_id, region_id, updated_utc, {', '.join(metrics)} FROM indicators_wide "
+           f"{where_sql(where)} ORDER BY run_id, region_id LIMIT %s")
+    async for wide in query_rows(sql, params):
+        rows = (await run_in_threadpool(unpivot, wide, metrics, confidence))[:left]
+        left -= len(rows)
+        if rows:
+            yield rows
+
+@router.get("/indicators.{fmt}")
+async def indicators_columnar(fmt: Literal["parquet", "arrow"], metric: list[str] | None=Query(None),
+                              run_from: int | None=None, run_to: int | None=None, limit: int | None=None):
+    """Indicator history, long format. run_from/run_to are runs.id bounds (inclusive); metric may repeat."""
+    return columnar_response("indicators", fmt, indicator_rows(metric, run_from, run_to, capped(limit)), INDICATOR_SCHEMA)
+
+@router.get("/alerts.{fmt}")
+async def alerts_columnar(fmt: Literal["parquet", "arrow"], domain: list[str] | None=Query(None),
+                          run_from: int | None=None, run_to: int | None=None, limit: int | None=None):
+    """Alert history. run_from/run_to are runs.id bounds (inclusive); domain may repeat."""
+    where, params = [], []
+    run_range(where, params, run_from, run_to)
+    if domain:
+        where.append("domain = ANY(%s)")
+        params.append(domain)
+    params.append(capped(limit))
+    sql = ("SELECT id, run_id, region_id, domain, severity, title, message, valid_start_utc, valid_end_utc, created_utc "
+           f"FROM alerts {where_sql(where)} ORDER BY run_id, id LIMIT %s")
+    return columnar_response("alerts", fmt, query_rows(sql, params), ALERT_SCHEMA)
+
+@router.get("/field_reports.{fmt}")
+async def field_reports_columnar(fmt: Literal["parquet", "arrow"], report_type: list[str] | None=Query(None),
+                                 run_from: int | None=None, run_to: int | None=None, limit: int | None=None):
+    """Field reports received between the run_from and run_to runs (by run time, inclusive)."""
+    where, params = [], []
+    if run_from is not None:
+        where.append("created_utc >= (SELECT run_time_utc FROM runs WHERE id=%s)")
+        params.append(run_from)
+    if run_to is not None:
+        where.append("created_utc <= (SELECT run_time_utc FROM runs WHERE id=%s)")
+        params.append(run_to)
+    if report_type:
+        where.append("report_type = ANY(%s)")
+        params.append(report_type)
+    params.append(capped(limit))
+    sql = ("SELECT id, created_utc, region_id, coarse_geohash, report_type, status, trust_score "
+           f"FROM field_reports {where_sql(where)} ORDER BY id LIMIT %s")
+    return columnar_response("field_reports", fmt, query_rows(sql, params), FIELD_REPORT_SCHEMA)
@@ -1,5 +1,12 @@
+from api.db import pool_stats
+from api.redis_client import redis_pool_stats
 from fastapi import APIRouter
+
 router=APIRouter()
 @router.get('')
-def h():
+async def h():
     return {'ok': True}
+@router.get('/pools')
+async def pools():
+    """Connection pool utilization, for sizing DB_POOL_* / REDIS_POOL_MAX under load."""
+    return {'postgres': await pool_stats(), 'redis': redis_pool_stats()}
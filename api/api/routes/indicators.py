@@ -1,28 +1,39 @@
 from fastapi import APIRouter
+from fastapi.responses import Response
 from api.db import conn
+from api.run_cache import run_cache
+from api.spatial import bbox_filter
 
 router = APIRouter()
 
 @router.get("/top")
-def top(metric: str="cri", severity_min: int=2, limit: int=200,
-        min_lat: float | None=None, max_lat: float | None=None, min_lon: float | None=None, max_lon: float | None=None):
-    where = "WHERE i.metric=%s AND i.severity >= %s"
-    params = [metric, severity_min]
-    if None not in (min_lat, max_lat, min_lon, max_lon):
-        where += " AND r.lat BETWEEN %s AND %s AND r.lon BETWEEN %s AND %s"
-        params += [min_lat, max_lat, min_lon, max_lon]
+async def top(metric: str="cri", severity_min: int=2, limit: int=200,
+              min_lat: float | None=None, max_lat: float | None=None, min_lon: float | None=None, max_lon: float | None=None):
+    bbox = (min_lat, max_lat, min_lon, max_lon)
+    body = await run_cache().get_json("indicators.top", (metric, severity_min, limit, bbox),
+                                      lambda run: top_indicators(run, metric, severity_min, limit, bbox))
+    return Response(body or b"[]", media_type="application/json")
+
+async def top_indicators(run, metric, severity_min, limit, bbox, half_open=False):
+    # one row per region regardless of history; run_id drops regions the latest run no longer covers
+    where = "WHERE i.run_id=%s AND i.metric=%s AND i.severity >= %s"
+    params = [run[0], metric, severity_min]
+    if None not in bbox:
+        sql, bbox_params = bbox_filter(bbox, half_open=half_open)
+        where += sql
+        params += bbox_params
     q = f"""
     SELECT i.region_id, i.value, i.severity, i.confidence, i.updated_utc, r.lat, r.lon, r.admin0, r.admin1, r.admin2
-    FROM indicators i
+    FROM latest_indicator_values i
     LEFT JOIN regions r ON r.region_id = i.region_id
     {where}
     ORDER BY i.severity DESC, i.value DESC
     LIMIT %s
     """
     params.append(limit)
-    with conn().cursor() as cur:
-        cur.execute(q, params)
-        rows = cur.fetchall()
+    async with conn() as c, c.cursor() as cur:
+        await cur.execute(q, params)
+        rows = await cur.fetchall()
     return [{
         "region_id": a[0], "value": a[1], "severity": a[2], "confidence": a[3],
         "updated_utc": a[4].isoformat(),
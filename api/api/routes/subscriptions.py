@@ -3,8 +3,8 @@ from pydantic import BaseModel, Field
 from datetime import datetime, timezone
 from api.db import conn
 from api.redis_client import rconn
-from api.settings import Settings
-from or_shared.rate_limit import token_bucket_allow
+from api.settings import get_settings
+from or_shared.rate_limit import token_bucket_allow_async
 import hashlib
 
 router = APIRouter()
@@ -19,18 +19,18 @@ def h(x: str) -> str:
     return hashlib.sha256(x.strip().lower().encode("utf-8")).hexdigest()
 
 @router.post("")
-def subscribe(su: SubIn, request: Request):
-    s = Settings()
+async def subscribe(su: SubIn, request: Request):
+    s = get_settings()
     redis = rconn()
     ip = request.client.host if request.client else "unknown"
     key = f"subs:ip:{ip}"
     cap = s.subs_per_ip_per_hour
     refill = cap / 3600.0
-    if not token_bucket_allow(redis, key, capacity=cap, refill_per_sec=refill):
+    if not await token_bucket_allow_async(redis, key, capacity=cap, refill_per_sec=refill):
         raise HTTPException(status_code=429, detail="Subscription rate limit exceeded")
     now = datetime.now(timezone.utc)
-    with conn().cursor() as cur:
-        cur.execute(
+    async with conn() as c, c.cursor() as cur:
+        await cur.execute(
             "INSERT INTO subscriptions(created_utc, channel, contact_hash, region_id, severity_min, active, meta) "
             "VALUES (%s,%s,%s,%s,%s,TRUE,%s)",
             (now, su.channel, h(su.contact), su.region_id, su.severity_min, "{}")
@@ -0,0 +1,29 @@
+from api.routes.alerts import latest_alerts
+from api.routes.indicators import top_indicators
+from api.run_cache import run_cache
+from api.spatial import tile_bbox
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
+
+router = APIRouter()
+
+# More cells than a MIN_TILE_ZOOM tile holds, so tiles are never truncated.
+TILE_LIMIT = 10000
+
+@router.get("/{z}/{x}/{y}/indicators")
+async def indicators_tile(z: int, x: int, y: int, metric: str="cri", severity_min: int=0):
+    """Latest-run indicator cells inside one z/x/y map tile."""
+    bbox = tile_bbox(z, x, y)
+    body = await run_cache().get_json("tiles.indicators", (z, x, y, metric, severity_min),
+                                      lambda run: top_indicators(run, metric, severity_min, TILE_LIMIT, bbox, half_open=True))
+    return Response(body or b"[]", media_type="application/json")
+
+@router.get("/{z}/{x}/{y}/alerts")
+async def alerts_tile(z: int, x: int, y: int, severity_min: int=2):
+    """Latest-run alerts for cells inside one z/x/y map tile."""
+    bbox = tile_bbox(z, x, y)
+    body = await run_cache().get_json("tiles.alerts", (z, x, y, severity_min),
+                                      lambda run: latest_alerts(run, severity_min, TILE_LIMIT, bbox, half_open=True))
+    if body is None:
+        raise HTTPException(status_code=404, detail="No runs yet")
+    return Response(body, media_type="application/json")
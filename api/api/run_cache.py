@@ -0,0 +1,99 @@
+import asyncio
+import json
+import logging
+import time
+
+import psycopg
+from or_shared.events import RUN_COMPLETED_CHANNEL
+
+from api.db import conn
+from api.settings import get_settings
+
+log = logging.getLogger(__name__)
+
+class RunCache:
+    """Responses of latest-run endpoints, versioned by the latest run's id.
+
+    The latest run row is remembered until the worker announces a new one on
+    RUN_COMPLETED_CHANNEL, so cached reads cost neither the runs lookup nor the
+    data query. Every entry belongs to a single run and the whole cache is
+    dropped when the run changes. `ttl_sec` bounds staleness if notifications
+    are missed (listener reconnecting, NOTIFY dropped by a pooler).
+    """
+
+    def __init__(self, ttl_sec, max_entries):
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.run = None         # (id, run_id, run_time_utc) or None
+        self.checked = None     # monotonic time of the last runs lookup
+        self.entries = {}
+
+    def invalidate(self):
+        self.checked = None
+
+    async def latest_run(self):
+        if self.checked is not None and time.monotonic() - self.checked < self.ttl_sec:
+            return self.run
+        async with conn() as c, c.cursor() as cur:
+            await cur.execute("SELECT id, run_id, run_time_utc FROM runs ORDER BY run_time_utc DESC LIMIT 1")
+            run = await cur.fetchone()
+        self.checked = time.monotonic()
+        if run != self.run:
+            self.run = run
+            self.entries = {}
+        return run
+
+    async def get(self, name, params, build):
+        """Cached `await build(run)` for the latest run; `params` must be hashable.
+
+        Concurrent misses for the same key share one build. Returns None without
+        caching when there are no runs yet.
+        """
+        run = await self.latest_run()
+        if run is None:
+            return None
+        key = (run[0], name, params)
+        task = self.entries.get(key)
+        if task is None:
+            if len(self.entries) >= self.max_entries:
+                self.entries.pop(next(iter(self.entries)))
+            task = self.entries[key] = asyncio.ensure_future(build(run))
+        try:
+            # shielded: a client disconnecting must not cancel a shared build
+            return await asyncio.shield(task)
+        except Exception:
+            if self.entries.get(key) is task:
+                del self.entries[key]
+            raise
+
+    async def get_json(self, name, params, build):
+        """Like get(), but caches the JSON-encoded body so hits skip serialization too."""
+        async def encoded(run):
+            return json.dumps(await build(run), separators=(",", ":")).encode()
+        return await self.get(name, params, encoded)
+
+_cache: RunCache | None = None
+
+def run_cache() -> RunCache:
+    global _cache
+    if _cache is None:
+        s = get_settings()
+        _cache = RunCache(s.run_cache_ttl_sec, s.run_cache_max_entries)
+    return _cache
+
+async def listen_for_runs():
+    """LISTEN for new runs and invalidate the cache; reconnects until cancelled."""
+    s = get_settings()
+    while True:
+        try:
+            async with await psycopg.AsyncConnection.connect(s.postgres_url, autocommit=True) as c:
+                await c.execute(f"LISTEN {RUN_COMPLETED_CHANNEL}")
+                # anything committed while we were not listening
+                run_cache().invalidate()
+                async for _ in c.notifies():
+                    run_cache().invalidate()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.warning("run listener disconnected; retrying", exc_info=True)
+            await asyncio.sleep(5)
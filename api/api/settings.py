@@ -1,9 +1,41 @@
 import os
+import tempfile
+from functools import lru_cache
+
 from pydantic import BaseModel
+
+
 class Settings(BaseModel):
     postgres_url: str = os.environ['POSTGRES_URL']
     redis_url: str = os.environ['REDIS_URL']
     version: str = os.environ.get('OR_VERSION','0.3.0')
     rate_limit_per_minute: int = int(os.environ.get('RATE_LIMIT_PER_MINUTE','60'))
+    rate_limit_local: bool = os.environ.get('RATE_LIMIT_LOCAL','1') == '1'
+    rate_limit_sync_sec: float = float(os.environ.get('RATE_LIMIT_SYNC_SEC','1.0'))
+    rate_limit_local_max_keys: int = int(os.environ.get('RATE_LIMIT_LOCAL_MAX_KEYS','100000'))
+    rate_limit_exempt_paths: list[str] = [p for p in os.environ.get('RATE_LIMIT_EXEMPT_PATHS','/health').split(',') if p]
     reports_per_ip_per_hour: int = int(os.environ.get('REPORTS_PER_IP_PER_HOUR','30'))
     subs_per_ip_per_hour: int = int(os.environ.get('SUBS_PER_IP_PER_HOUR','30'))
+    db_pool_min: int = int(os.environ.get('DB_POOL_MIN','2'))
+    db_pool_max: int = int(os.environ.get('DB_POOL_MAX','10'))
+    db_pool_timeout_sec: float = float(os.environ.get('DB_POOL_TIMEOUT_SEC','10'))
+    db_pool_max_idle_sec: float = float(os.environ.get('DB_POOL_MAX_IDLE_SEC','300'))
+    db_pool_check: bool = os.environ.get('DB_POOL_CHECK','1') == '1'
+    redis_pool_max: int = int(os.environ.get('REDIS_POOL_MAX','50'))
+    redis_pool_timeout_sec: float = float(os.environ.get('REDIS_POOL_TIMEOUT_SEC','5'))
+    run_cache_ttl_sec: float = float(os.environ.get('RUN_CACHE_TTL_SEC','60'))
+    run_cache_max_entries: int = int(os.environ.get('RUN_CACHE_MAX_ENTRIES','1024'))
+    export_max_rows: int = int(os.environ.get('EXPORT_MAX_ROWS','1000000'))
+    export_fetch_rows: int = int(os.environ.get('EXPORT_FETCH_ROWS','5000'))
+    export_chunk_bytes: int = int(os.environ.get('EXPORT_CHUNK_BYTES','65536'))
+    brief_cache_dir: str = os.environ.get('BRIEF_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'openresilience-briefs'))
+    brief_prerender_severity: int = int(os.environ.get('BRIEF_PRERENDER_SEVERITY','2'))
+    brief_keep_runs: int = int(os.environ.get('BRIEF_KEEP_RUNS','2'))
+    brief_batch_max: int = int(os.environ.get('BRIEF_BATCH_MAX','2000'))
+    brief_render_processes: int = int(os.environ.get('BRIEF_RENDER_PROCESSES','0'))
+    redis_health_check_sec: int = int(os.environ.get('REDIS_HEALTH_CHECK_SEC','30'))
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Process-wide settings; the environment is read once at first use."""
+    return Settings()
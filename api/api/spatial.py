@@ -0,0 +1,38 @@
+import math
+
+from fastapi import HTTPException
+
+# Below this zoom one tile holds thousands of 0.25 deg cells.
+MIN_TILE_ZOOM = 5
+MAX_TILE_ZOOM = 18
+
+def bbox_filter(bbox, alias="r", half_open=False):
+    """SQL predicate + params for a (min_lat, max_lat, min_lon, max_lon) box.
+
+    Written against the idx_regions_point GiST expression. Edges are inclusive;
+    with half_open the east/north edges are excluded, so a cell on the edge
+    shared by two tiles belongs to exactly one of them.
+    """
+    min_lat, max_lat, min_lon, max_lon = bbox
+    sql = f" AND point({alias}.lon, {alias}.lat) <@ box(point(%s, %s), point(%s, %s))"
+    params = [min_lon, min_lat, max_lon, max_lat]
+    if half_open:
+        sql += f" AND {alias}.lon < %s AND {alias}.lat < %s"
+        params += [max_lon, max_lat]
+    return sql, params
+
+def _tile_edge_lat(t, n):
+    """Latitude of the top edge of tile row t at n tiles per side."""
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * t / n))))
+
+def tile_bbox(z, x, y):
+    """(min_lat, max_lat, min_lon, max_lon) of a Web Mercator (slippy map) tile."""
+    if not MIN_TILE_ZOOM <= z <= MAX_TILE_ZOOM:
+        raise HTTPException(status_code=422, detail=f"z must be between {MIN_TILE_ZOOM} and {MAX_TILE_ZOOM}")
+    n = 2 ** z
+    if not (0 <= x < n and 0 <= y < n):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+    # the polar rows of the world reach past Mercator's +-85.05 limit
+    max_lat = 90.0 if y == 0 else _tile_edge_lat(y, n)
+    min_lat = -90.0 if y == n - 1 else _tile_edge_lat(y + 1, n)
+    return (min_lat, max_lat, x / n * 360 - 180, (x + 1) / n * 360 - 180)
@@ -0,0 +1,23 @@
+import io
+
+
+class ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable sink for writers that stream into a response.
+
+    Parquet/Arrow/zip writers append to it; the response generator drains
+    whatever was written since the last chunk.
+    """
+    def __init__(self):
+        self.parts, self.pos = [], 0
+    def writable(self):
+        return True
+    def write(self, b):
+        self.parts.append(bytes(b))
+        self.pos += len(b)
+        return len(b)
+    def tell(self):
+        return self.pos
+    def drain(self):
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
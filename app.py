@@ -37,9 +37,9 @@ sys.path.insert(0, 'src')
 
 # Import OpenResilience modules
 try:
-    from openresilience.scoring import compute_resilience_scores, ResilienceScores
+    from openresilience.scoring import score_dataframe, ResilienceScores
     from openresilience.database import (
-        init_database, ensure_region, insert_run, get_recent_runs,
+        init_database, ensure_region, insert_run, insert_county_runs, get_recent_runs,
         insert_field_report, get_recent_reports, create_alert, get_active_alerts
     )
     from openresilience.agriculture import get_planting_advice, get_next_planting_window
@@ -353,54 +353,70 @@ def load_county_data():
         # Field reports based on severity
         field_reports = 0    # Demo: no community reports. Real submissions appear in Field Reports tab.
         
-        # Compute multi-index scores
-        if SCORING_AVAILABLE:
-            try:
-                scores = compute_resilience_scores(
-                    rainfall_anomaly=rainfall_anom,
-                    soil_moisture=soil_moisture,
-                    vegetation_health=vegetation,
-                    staple_price_change=price_change,
-                    market_stockouts=stockouts,
-                    field_reports_24h=field_reports
-                )
-                
-                wsi = scores.wsi / 100  # Convert to 0-1 for display
-                fsi = scores.fsi / 100
-                msi = scores.msi / 100
-                cri = scores.cri / 100
-                confidence = scores.confidence
-            except Exception as e:
-                # Fallback to simple calculation
-                wsi = ((-rainfall_anom / 100) * 0.6 + (1 - soil_moisture) * 0.4)
-                fsi = wsi * 0.8
-                msi = (price_change / 100) * 0.7
-                cri = (wsi * 0.45 + fsi * 0.35 + msi * 0.20)
-                confidence = 50
-        else:
-            # Simple fallback calculation
-            wsi = ((-rainfall_anom / 100) * 0.6 + (1 - soil_moisture) * 0.4)
-            fsi = wsi * 0.8
-            msi = (price_change / 100) * 0.7
-            cri = (wsi * 0.45 + fsi * 0.35 + msi * 0.20)
-            confidence = 50
-        
         county_list.append({
             'County': county,
             'Lat': info['lat'],
             'Lon': info['lon'],
             'Population': info['pop'],
             'ASAL': 'Yes' if info['arid'] else 'No',
-            'Current_Stress': cri,  # Use CRI as primary stress indicator
-            'WSI': wsi,  # Water Stress Index
-            'FSI': fsi,  # Food Stress Index
-            'MSI': msi,  # Market Stress Index
-            'CRI': cri,  # Composite Risk Index
-            'Confidence': confidence,
-            'Severity': 3 if cri > 0.70 else 2 if cri > 0.50 else 1 if cri > 0.30 else 0,
-            'DataSource': data_source  # Track if using real NASA data
+            'DataSource': data_source,  # Track if using real NASA data
+            # Input signals, scored below for all counties at once
+            'rainfall_anomaly': rainfall_anom,
+            'soil_moisture': soil_moisture,
+            'vegetation_health': vegetation,
+            'staple_price_change': price_change,
+            'market_stockouts': stockouts,
+            'field_reports_24h': field_reports,
         })
     
+    df = pd.DataFrame(county_list)
+    signal_columns = [
+        'rainfall_anomaly', 'soil_moisture', 'vegetation_health',
+        'staple_price_change', 'market_stockouts', 'field_reports_24h'
+    ]
+    
+    # Compute multi-index scores (one vectorized pass over all counties)
+    scores = None
+    if SCORING_AVAILABLE:
+        try:
+            scores = score_dataframe(df[signal_columns])
+        except Exception as e:
+            scores = None  # Fall back to simple calculation
+    
+    # Record the pass so the SMS webhook's STATUS replies follow the dashboard
+    if scores is not None and DB_AVAILABLE:
+        try:
+            runs = pd.concat([df, scores], axis=1).rename(columns={
+                'County': 'county', 'Lat': 'latitude', 'Lon': 'longitude',
+                'Population': 'population', 'DataSource': 'data_mode'
+            })
+            insert_county_runs(runs.to_dict('records'), notes="dashboard scoring pass")
+        except Exception as e:
+            print(f"Could not record scoring run: {e}")
+
+    if scores is not None:
+        wsi = scores['wsi'] / 100  # Convert to 0-1 for display
+        fsi = scores['fsi'] / 100
+        msi = scores['msi'] / 100
+        cri = scores['cri'] / 100
+        confidence = scores['confidence']
+    else:
+        # Simple fallback calculation
+        wsi = ((-df['rainfall_anomaly'] / 100) * 0.6 + (1 - df['soil_moisture']) * 0.4)
+        fsi = wsi * 0.8
+        msi = (df['staple_price_change'] / 100) * 0.7
+        cri = (wsi * 0.45 + fsi * 0.35 + msi * 0.20)
+        confidence = 50
+    
+    df = df.drop(columns=signal_columns)
+    df.insert(5, 'Current_Stress', cri)  # Use CRI as primary stress indicator
+    df.insert(6, 'WSI', wsi)  # Water Stress Index
+    df.insert(7, 'FSI', fsi)  # Food Stress Index
+    df.insert(8, 'MSI', msi)  # Market Stress Index
+    df.insert(9, 'CRI', cri)  # Composite Risk Index
+    df.insert(10, 'Confidence', confidence)
+    df.insert(11, 'Severity', np.select([cri > 0.70, cri > 0.50, cri > 0.30], [3, 2, 1], 0))
+    
     # Show NASA data usage summary
     if nasa_success_count > 0:
         st.sidebar.success(f"🛰️ Using NASA satellite data for {nasa_success_count} counties")
@@ -409,7 +425,7 @@ def load_county_data():
     if gee_success_count > 0:
         st.sidebar.success(f"🌍 Using Earth Engine vegetation data for {gee_success_count} counties")
     
-    return pd.DataFrame(county_list)
+    return df
 
 def generate_forecast(county_name, current_stress, is_asal):
     """Generate actionable short, mid, long-term forecast."""
@@ -0,0 +1,9 @@
+-- Grids whose cells have already been upserted into regions. The worker skips
+-- the region upsert for a (shape, step) signature listed here.
+CREATE TABLE IF NOT EXISTS grids (
+  signature TEXT PRIMARY KEY,
+  h INT NOT NULL,
+  w INT NOT NULL,
+  step_deg REAL NOT NULL,
+  created_utc TIMESTAMP NOT NULL
+);
@@ -0,0 +1,42 @@
+-- One row per (run, region) holding every metric, instead of eight narrow
+-- rows each repeating confidence and provenance. Both now live on runs.
+ALTER TABLE runs ADD COLUMN IF NOT EXISTS confidence TEXT CHECK (confidence IN ('high','medium','low'));
+ALTER TABLE runs ADD COLUMN IF NOT EXISTS provenance JSONB;
+
+CREATE TABLE IF NOT EXISTS indicators_wide (
+  run_id BIGINT NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+  region_id TEXT NOT NULL,
+  rain_anom REAL NOT NULL,
+  soil_pct REAL NOT NULL,
+  ndvi_anom REAL NOT NULL,
+  persistence_wk SMALLINT NOT NULL,
+  wsi SMALLINT NOT NULL CHECK (wsi BETWEEN 0 AND 3),
+  fsi SMALLINT NOT NULL CHECK (fsi BETWEEN 0 AND 3),
+  msi SMALLINT NOT NULL CHECK (msi BETWEEN 0 AND 3),
+  cri SMALLINT NOT NULL CHECK (cri BETWEEN 0 AND 3),
+  updated_utc TIMESTAMP NOT NULL
+);
+
+-- Narrow-shaped view over both layouts: legacy rows from indicators plus the
+-- wide rows unpivoted. Readers that filter by metric read one wide row per
+-- region instead of eight narrow ones.
+CREATE OR REPLACE VIEW indicator_values AS
+SELECT n.run_id, n.region_id, n.metric, n.value, n.severity, n.confidence, n.provenance, n.updated_utc
+FROM indicators n
+UNION ALL
+SELECT w.run_id, w.region_id, m.metric, m.value, m.severity, r.confidence, r.provenance, w.updated_utc
+FROM indicators_wide w
+JOIN runs r ON r.id = w.run_id
+CROSS JOIN LATERAL (VALUES
+  ('rain_anom', w.rain_anom, 0),
+  ('soil_pct', w.soil_pct, 0),
+  ('ndvi_anom', w.ndvi_anom, 0),
+  ('persistence_wk', w.persistence_wk::real, 0),
+  ('wsi', w.wsi::real, w.wsi::int),
+  ('fsi', w.fsi::real, w.fsi::int),
+  ('msi', w.msi::real, w.msi::int),
+  ('cri', w.cri::real, w.cri::int)
+) AS m(metric, value, severity);
+
+CREATE INDEX IF NOT EXISTS idx_indicators_wide_run ON indicators_wide(run_id, region_id);
+CREATE INDEX IF NOT EXISTS idx_indicators_wide_region ON indicators_wide(region_id, updated_utc DESC);
@@ -0,0 +1,100 @@
+-- Monthly range partitions for the per-run tables. indicators_wide is split on
+-- updated_utc and alerts on created_utc (both equal the run time), so queries
+-- pinned to the latest run only touch the newest partition and retention can
+-- drop whole months. Partitions are named <parent>_pYYYYMM.
+
+CREATE OR REPLACE FUNCTION ensure_month_partition(parent TEXT, ts TIMESTAMP) RETURNS TEXT AS $$
+DECLARE
+  lo DATE := date_trunc('month', ts)::date;
+  part TEXT := format('%s_p%s', parent, to_char(lo, 'YYYYMM'));
+BEGIN
+  EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                 part, parent, lo, (lo + INTERVAL '1 month')::date);
+  RETURN part;
+END $$ LANGUAGE plpgsql;
+
+-- Summaries of dropped partitions, written by the worker retention job.
+CREATE TABLE IF NOT EXISTS indicator_rollups (
+  month DATE NOT NULL,
+  region_id TEXT NOT NULL,
+  runs INT NOT NULL,
+  avg_wsi REAL NOT NULL,
+  avg_fsi REAL NOT NULL,
+  avg_msi REAL NOT NULL,
+  avg_cri REAL NOT NULL,
+  max_cri SMALLINT NOT NULL,
+  PRIMARY KEY (month, region_id)
+);
+
+CREATE TABLE IF NOT EXISTS alert_rollups (
+  month DATE NOT NULL,
+  region_id TEXT NOT NULL,
+  domain TEXT NOT NULL,
+  alerts INT NOT NULL,
+  max_severity INT NOT NULL,
+  PRIMARY KEY (month, region_id, domain)
+);
+
+-- Convert existing unpartitioned tables in place, keeping their rows.
+DO $$
+DECLARE m TIMESTAMP;
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_class WHERE relname = 'indicators_wide' AND relkind = 'r') THEN
+    DROP VIEW IF EXISTS indicator_values;
+    ALTER TABLE indicators_wide RENAME TO indicators_wide_unpartitioned;
+    CREATE TABLE indicators_wide (
+      LIKE indicators_wide_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+      FOREIGN KEY (run_id) REFERENCES runs(id) ON DELETE CASCADE
+    ) PARTITION BY RANGE (updated_utc);
+    FOR m IN SELECT DISTINCT date_trunc('month', updated_utc) FROM indicators_wide_unpartitioned LOOP
+      PERFORM ensure_month_partition('indicators_wide', m);
+    END LOOP;
+    INSERT INTO indicators_wide SELECT * FROM indicators_wide_unpartitioned;
+    DROP TABLE indicators_wide_unpartitioned;
+  END IF;
+
+  IF EXISTS (SELECT 1 FROM pg_class WHERE relname = 'alerts' AND relkind = 'r') THEN
+    ALTER TABLE alerts RENAME TO alerts_unpartitioned;
+    ALTER INDEX alerts_pkey RENAME TO alerts_unpartitioned_pkey;
+    CREATE TABLE alerts (
+      LIKE alerts_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+      PRIMARY KEY (id, created_utc),
+      FOREIGN KEY (run_id) REFERENCES runs(id) ON DELETE CASCADE
+    ) PARTITION BY RANGE (created_utc);
+    ALTER SEQUENCE alerts_id_seq OWNED BY alerts.id;
+    FOR m IN SELECT DISTINCT date_trunc('month', created_utc) FROM alerts_unpartitioned LOOP
+      PERFORM ensure_month_partition('alerts', m);
+    END LOOP;
+    INSERT INTO alerts SELECT * FROM alerts_unpartitioned;
+    DROP TABLE alerts_unpartitioned;
+  END IF;
+END $$;
+
+SELECT ensure_month_partition(t, ts)
+FROM unnest(ARRAY['indicators_wide', 'alerts']) AS t,
+     unnest(ARRAY[NOW() AT TIME ZONE 'UTC', (NOW() AT TIME ZONE 'UTC') + INTERVAL '1 month']) AS ts;
+
+CREATE INDEX IF NOT EXISTS idx_indicators_wide_run ON indicators_wide(run_id, region_id);
+CREATE INDEX IF NOT EXISTS idx_indicators_wide_region ON indicators_wide(region_id, updated_utc DESC);
+CREATE INDEX IF NOT EXISTS idx_alerts_recent ON alerts(created_utc DESC);
+CREATE INDEX IF NOT EXISTS idx_alerts_run ON alerts(run_id, severity);
+-- Lets latest-run reads of the legacy narrow table skip old history too.
+CREATE INDEX IF NOT EXISTS idx_indicators_updated ON indicators(updated_utc);
+
+CREATE OR REPLACE VIEW indicator_values AS
+SELECT n.run_id, n.region_id, n.metric, n.value, n.severity, n.confidence, n.provenance, n.updated_utc
+FROM indicators n
+UNION ALL
+SELECT w.run_id, w.region_id, m.metric, m.value, m.severity, r.confidence, r.provenance, w.updated_utc
+FROM indicators_wide w
+JOIN runs r ON r.id = w.run_id
+CROSS JOIN LATERAL (VALUES
+  ('rain_anom', w.rain_anom, 0),
+  ('soil_pct', w.soil_pct, 0),
+  ('ndvi_anom', w.ndvi_anom, 0),
+  ('persistence_wk', w.persistence_wk::real, 0),
+  ('wsi', w.wsi::real, w.wsi::int),
+  ('fsi', w.fsi::real, w.fsi::int),
+  ('msi', w.msi::real, w.msi::int),
+  ('cri', w.cri::real, w.cri::int)
+) AS m(metric, value, severity);
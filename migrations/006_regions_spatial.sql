@@ -0,0 +1,5 @@
+-- GiST index on the region centroid for bbox and map-tile lookups. Built-in
+-- point/box operators, so no PostGIS needed. Queries must use the same
+-- expression: point(r.lon, r.lat) <@ box(point(west, south), point(east, north)).
+CREATE INDEX IF NOT EXISTS idx_regions_point ON regions USING gist (point(lon, lat));
+ANALYZE regions;
@@ -0,0 +1,48 @@
+-- Newest indicator row per region, upserted by the worker in the run
+-- transaction. Brief and latest-run lookups read one row per region no matter
+-- how much history indicators_wide holds.
+CREATE TABLE IF NOT EXISTS latest_indicators (
+  region_id TEXT PRIMARY KEY,
+  run_id BIGINT NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+  updated_utc TIMESTAMP NOT NULL,
+  confidence TEXT,
+  rain_anom REAL NOT NULL,
+  soil_pct REAL NOT NULL,
+  ndvi_anom REAL NOT NULL,
+  persistence_wk SMALLINT NOT NULL,
+  wsi SMALLINT NOT NULL,
+  fsi SMALLINT NOT NULL,
+  msi SMALLINT NOT NULL,
+  cri SMALLINT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_latest_indicators_run ON latest_indicators(run_id);
+
+-- One-time backfill from history. Migrations are re-applied on every start,
+-- so it only runs while the table is still empty; the worker keeps it
+-- current from then on.
+INSERT INTO latest_indicators
+SELECT DISTINCT ON (w.region_id) w.region_id, w.run_id, w.updated_utc, r.confidence,
+       w.rain_anom, w.soil_pct, w.ndvi_anom, w.persistence_wk, w.wsi, w.fsi, w.msi, w.cri
+FROM indicators_wide w
+JOIN runs r ON r.id = w.run_id
+WHERE NOT EXISTS (SELECT 1 FROM latest_indicators)
+ORDER BY w.region_id, w.updated_utc DESC
+ON CONFLICT (region_id) DO NOTHING;
+
+-- Same columns as indicator_values, latest row per region only.
+CREATE OR REPLACE VIEW latest_indicator_values AS
+SELECT l.run_id, l.region_id, m.metric, m.value, m.severity, l.confidence, l.updated_utc
+FROM latest_indicators l
+CROSS JOIN LATERAL (VALUES
+  ('rain_anom', l.rain_anom, 0),
+  ('soil_pct', l.soil_pct, 0),
+  ('ndvi_anom', l.ndvi_anom, 0),
+  ('persistence_wk', l.persistence_wk::real, 0),
+  ('wsi', l.wsi::real, l.wsi::int),
+  ('fsi', l.fsi::real, l.fsi::int),
+  ('msi', l.msi::real, l.msi::int),
+  ('cri', l.cri::real, l.cri::int)
+) AS m(metric, value, severity);
+
+-- Recent alerts of one region (briefs) without walking the global time index.
+CREATE INDEX IF NOT EXISTS idx_alerts_region ON alerts(region_id, created_utc DESC);
@@ -0,0 +1,14 @@
+-- Notifier messages that failed every delivery attempt, kept for inspection
+-- and manual replay instead of being dropped.
+CREATE TABLE IF NOT EXISTS dead_letters (
+  id BIGSERIAL PRIMARY KEY,
+  created_utc TIMESTAMP NOT NULL,
+  provider TEXT NOT NULL,
+  subscription_id BIGINT,
+  channel TEXT NOT NULL,
+  contact_hash TEXT NOT NULL,
+  body TEXT NOT NULL,
+  attempts INT NOT NULL,
+  error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_dead_letters_recent ON dead_letters(created_utc DESC);
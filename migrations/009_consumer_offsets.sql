@@ -0,0 +1,7 @@
+-- Last run each event consumer has fully processed. Consumers resume from
+-- here after a restart instead of re-deriving state from wall-clock windows.
+CREATE TABLE IF NOT EXISTS consumer_offsets (
+  consumer TEXT PRIMARY KEY,
+  run_id BIGINT NOT NULL,
+  updated_utc TIMESTAMP NOT NULL
+);
@@ -0,0 +1,18 @@
+-- Notifier outbox: one row per (subscription, alert) message. The
+-- idempotency key makes enqueueing a run repeatable without duplicates, and
+-- replicas claim pending rows with FOR UPDATE SKIP LOCKED.
+CREATE TABLE IF NOT EXISTS outbox (
+  id BIGSERIAL PRIMARY KEY,
+  idempotency_key TEXT NOT NULL UNIQUE,
+  created_utc TIMESTAMP NOT NULL,
+  run_id BIGINT NOT NULL,
+  subscription_id BIGINT NOT NULL,
+  channel TEXT NOT NULL,
+  contact_hash TEXT NOT NULL,
+  body TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending',  -- pending | in_flight | sent | dead | superseded
+  attempts INT NOT NULL DEFAULT 0,
+  done_utc TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_pending ON outbox(id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_outbox_done ON outbox(done_utc) WHERE status <> 'pending';
@@ -0,0 +1,3 @@
+-- Run-ordered reads of the legacy narrow table (keyset CSV paging, columnar
+-- exports) walk this index instead of sorting all of history.
+CREATE INDEX IF NOT EXISTS idx_indicators_run ON indicators(run_id, region_id, metric);
@@ -0,0 +1,5 @@
+-- Delivery leases: the notifier marks claimed messages in_flight until
+-- lease_until and sends them outside any transaction. A lease that runs out
+-- (the replica died mid-batch) hands its messages back to the queue.
+ALTER TABLE outbox ADD COLUMN IF NOT EXISTS lease_until TIMESTAMP;
+CREATE INDEX IF NOT EXISTS idx_outbox_in_flight ON outbox(lease_until) WHERE status = 'in_flight';
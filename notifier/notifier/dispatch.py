@@ -0,0 +1,96 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from notifier.providers import PermanentSendError
+
+
+class Message(NamedTuple):
+    subscription_id: int
+    channel: str
+    to_hash: str
+    text: str
+    idempotency_key: str | None = None  # outbox key, for providers that dedup on one
+
+class Outcome(NamedTuple):
+    message: Message
+    attempts: int
+    error: str | None  # None = delivered
+
+class RateLimiter:
+    """Spaces calls at least 1/rps apart across threads; rps <= 0 disables it."""
+    def __init__(self, rps):
+        self.interval = 1.0 / rps if rps > 0 else 0.0
+        self.next_at = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            at = max(now, self.next_at)
+            self.next_at = at + self.interval
+        if at > now:
+            time.sleep(at - now)
+
+class Dispatcher:
+    """Sends messages through one provider on a bounded thread pool.
+
+    At most `concurrency` sends are in flight and at most `rps` start per
+    second. Failures are retried with exponential backoff and jitter up to
+    `max_attempts`; PermanentSendError is not retried.
+    """
+    def __init__(self, provider, concurrency, rps, max_attempts=4, backoff_base_sec=0.5, backoff_max_sec=30.0):
+        self.provider = provider
+        self.pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"send-{provider.name}")
+        self.rate = RateLimiter(rps)
+        self.max_attempts = max_attempts
+        self.backoff_base_sec = backoff_base_sec
+        self.backoff_max_sec = backoff_max_sec
+
+    def _deliver(self, m: Message) -> Outcome:
+        for attempt in range(1, self.max_attempts + 1):
+            self.rate.wait()
+            try:
+                if self.provider.accepts_idempotency_key:
+                    self.provider.send(m.to_hash, m.channel, m.text, idempotency_key=m.idempotency_key)
+                else:
+                    self.provider.send(m.to_hash, m.channel, m.text)
+                return Outcome(m, attempt, None)
+            except PermanentSendError as e:
+                return Outcome(m, attempt, f"{type(e).__name__}: {e}")
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    return Outcome(m, attempt, f"{type(e).__name__}: {e}")
+                delay = min(self.backoff_max_sec, self.backoff_base_sec * 2 ** (attempt - 1))
+                time.sleep(delay * random.uniform(0.5, 1.0))
+
+    def send_all(self, messages) -> list[Outcome]:
+        """Deliver a batch concurrently; returns one Outcome per message, in order."""
+        return list(self.pool.map(self._deliver, messages))
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+def dispatcher_from_env(provider):
+    env = os.environ.get
+    return Dispatcher(
+        provider,
+        concurrency=int(env("DISPATCH_CONCURRENCY", provider.max_concurrency)),
+        rps=float(env("DISPATCH_RPS", provider.max_rps)),
+        max_attempts=max(1, int(env("DISPATCH_MAX_ATTEMPTS", "4"))),  # 0 would deliver nothing
+        backoff_base_sec=float(env("DISPATCH_BACKOFF_SEC", "0.5")),
+    )
+
+def dead_letter(cur, provider_name, failed: list[Outcome]):
+    """Record messages that exhausted their retries, in one round trip."""
+    if failed:
+        cur.executemany(
+            "INSERT INTO dead_letters(created_utc, provider, subscription_id, channel, contact_hash, body, attempts, error) "
+            "VALUES ((NOW() AT TIME ZONE 'UTC'), %s, %s, %s, %s, %s, %s, %s)",
+            [(provider_name, o.message.subscription_id, o.message.channel, o.message.to_hash, o.message.text, o.attempts, o.error)
+             for o in failed])
@@ -1,46 +1,147 @@
 import os, time
-from datetime import datetime, timezone, timedelta
+import psycopg
 from notifier.db import conn
 from notifier.providers import get_provider
+from notifier.dispatch import Message, dispatcher_from_env, dead_letter
+from or_shared.events import RUN_COMPLETED_CHANNEL
 
-def format_alert(a):
-    return f"[{a['domain'].upper()} S{a['severity']}] {a['title']} • {a['region_id']}"
+CONSUMER = "notifier"
+
+# Active subscriptions joined to the run's alerts in one pass, one row per
+# subscription (its newest, then most severe, matching alert), enqueued as
+# outbox messages keyed by (subscription, alert). Every match is queued; the
+# throttle is applied at delivery, so a subscription notified moments ago
+# still gets this run once its window has passed. A key that is already
+# queued (a replica or an earlier attempt got there first) is left alone.
+ENQUEUE_RUN = """
+INSERT INTO outbox(idempotency_key, created_utc, run_id, subscription_id, channel, contact_hash, body)
+SELECT DISTINCT ON (s.id) s.id || ':' || a.id, (NOW() AT TIME ZONE 'UTC'), a.run_id, s.id, s.channel, s.contact_hash,
+       '[' || upper(a.domain) || ' S' || a.severity || '] ' || a.title || ' • ' || a.region_id
+FROM subscriptions s
+JOIN alerts a ON a.region_id = s.region_id AND a.severity >= s.severity_min
+WHERE s.active
+  AND a.run_id = %(run)s AND a.created_utc >= %(run_time)s
+ORDER BY s.id, a.created_utc DESC, a.severity DESC
+ON CONFLICT (idempotency_key) DO NOTHING
+"""
+
+# A newer run's message replaces a subscription's still-pending older one
+# (e.g. held back by the throttle), so a subscriber gets the current alert
+# and not a backlog. Both sides read only pending rows (idx_outbox_pending).
+SUPERSEDE_OLDER = """
+UPDATE outbox o SET status = 'superseded', done_utc = (NOW() AT TIME ZONE 'UTC')
+FROM outbox n
+WHERE n.status = 'pending' AND n.run_id = %(run)s
+  AND o.status = 'pending' AND o.run_id < n.run_id AND o.subscription_id = n.subscription_id
+"""
+
+# Lease up to a batch of deliverable messages in one short statement:
+# pending ones, plus in_flight ones whose lease ran out (the replica sending
+# them died before recording the outcome). Subscriptions inside the throttle
+# window are skipped; their messages stay pending for a later drain.
+CLAIM = """
+UPDATE outbox o SET status = 'in_flight', lease_until = (NOW() AT TIME ZONE 'UTC') + make_interval(secs => %(lease)s)
+WHERE o.id IN (
+  SELECT p.id FROM outbox p
+  JOIN subscriptions s ON s.id = p.subscription_id
+  WHERE (p.status = 'pending' OR (p.status = 'in_flight' AND p.lease_until < (NOW() AT TIME ZONE 'UTC')))
+    AND (s.last_sent_utc IS NULL OR s.last_sent_utc < (NOW() AT TIME ZONE 'UTC') - make_interval(secs => %(throttle)s))
+  ORDER BY p.id LIMIT %(limit)s
+  FOR UPDATE OF p SKIP LOCKED)
+RETURNING o.id, o.subscription_id, o.channel, o.contact_hash, o.body, o.idempotency_key
+"""
+
+def mark_sent(cur, sub_ids):
+    """One UPDATE for a whole batch of delivered subscriptions."""
+    if sub_ids:
+        cur.execute("UPDATE subscriptions SET last_sent_utc=(NOW() AT TIME ZONE 'UTC') WHERE id = ANY(%s)", (sub_ids,))
+
+def finish(cur, outcomes_by_id):
+    """Record each claimed message as sent or dead, with its attempt count, in one UPDATE."""
+    cur.execute(
+        "UPDATE outbox o SET status=v.status, attempts=o.attempts+v.attempts, done_utc=(NOW() AT TIME ZONE 'UTC'), lease_until=NULL "
+        "FROM unnest(%s::bigint[], %s::text[], %s::int[]) AS v(id, status, attempts) WHERE o.id = v.id AND o.status = 'in_flight'",
+        ([oid for oid, _ in outcomes_by_id],
+         ["sent" if o.error is None else "dead" for _, o in outcomes_by_id],
+         [o.attempts for _, o in outcomes_by_id]))
+
+def pending_run(c):
+    """Newest run past this consumer's offset; older unprocessed runs are superseded by it."""
+    return c.execute(
+        "SELECT id, run_id, run_time_utc FROM runs WHERE id > COALESCE((SELECT run_id FROM consumer_offsets WHERE consumer=%s), 0) "
+        "ORDER BY id DESC LIMIT 1", (CONSUMER,)).fetchone()
+
+def commit_offset(c, run_db_id):
+    c.execute("INSERT INTO consumer_offsets(consumer, run_id, updated_utc) VALUES (%s, %s, (NOW() AT TIME ZONE 'UTC')) "
+              "ON CONFLICT (consumer) DO UPDATE SET run_id=EXCLUDED.run_id, updated_utc=EXCLUDED.updated_utc "
+              "WHERE consumer_offsets.run_id < EXCLUDED.run_id", (CONSUMER, run_db_id))
+
+def enqueue_run(c, run):
+    """Queue one run's messages and move the offset past it, atomically; returns the count queued."""
+    params = {"run": run[0], "run_time": run[2]}
+    with c.transaction():
+        queued = c.execute(ENQUEUE_RUN, params).rowcount
+        c.execute(SUPERSEDE_OLDER, params)
+        commit_offset(c, run[0])
+    return queued
+
+def deliver(c, dispatcher, throttle_sec, batch_size=500, lease_sec=300):
+    """Lease and send outbox batches until none are deliverable; returns (sent, dead).
+
+    Sends happen outside any transaction, so retries and backoff hold no row
+    locks; the lease (lease_sec, longer than a batch takes to send) keeps
+    other replicas off the batch meanwhile. A crash between send and outcome
+    resends once the lease runs out; providers that accept an idempotency key
+    get the outbox key so they can drop the repeat.
+    """
+    sent = dead = 0
+    while True:
+        with c.transaction():
+            rows = c.execute(CLAIM, {"lease": lease_sec, "throttle": throttle_sec, "limit": batch_size}).fetchall()
+        if not rows:
+            return sent, dead
+        outcomes = dispatcher.send_all([Message(sid, channel, chash, body, key) for _, sid, channel, chash, body, key in rows])
+        failed = [o for o in outcomes if o.error is not None]
+        with c.transaction(), c.cursor() as cur:
+            finish(cur, [(r[0], o) for r, o in zip(rows, outcomes)])
+            mark_sent(cur, [o.message.subscription_id for o in outcomes if o.error is None])
+            dead_letter(cur, dispatcher.provider.name, failed)
+        sent += len(rows) - len(failed)
+        dead += len(failed)
+
+def drain(c, dispatcher, interval, batch_size=500, lease_sec=300):
+    """Queue the pending run, if any, then deliver everything outside the throttle window."""
+    run = pending_run(c)
+    if run is not None:
+        print(f"OK notify run={run[1]} queued={enqueue_run(c, run)}")
+    sent, dead = deliver(c, dispatcher, interval * 2, batch_size, lease_sec)
+    if sent or dead:
+        print(f"OK notify sent={sent} dead_lettered={dead}")
 
 def loop():
-    provider = get_provider()
+    """Wait for the worker's run-completed event, then notify about exactly that run.
+
+    The event only wakes the loop; consumer_offsets decides what is pending, so
+    runs committed while the notifier was down or a lost notification are
+    picked up at the next wake-up or after NOTIFY_INTERVAL_SEC at the latest.
+    Any number of replicas can run this: enqueueing is idempotent and each
+    outbox row is leased to one replica at a time.
+    """
+    dispatcher = dispatcher_from_env(get_provider())
     interval = int(os.environ.get("NOTIFY_INTERVAL_SEC","120"))
+    batch_size = int(os.environ.get("OUTBOX_BATCH","500"))
+    lease_sec = int(os.environ.get("OUTBOX_LEASE_SEC","300"))
     while True:
         try:
-            with conn().cursor() as cur:
-                cur.execute("SELECT id FROM runs ORDER BY run_time_utc DESC LIMIT 1")
-                run = cur.fetchone()
-                if not run:
-                    time.sleep(interval); continue
-                run_db_id = run[0]
-                cur.execute(
-                    "SELECT region_id, domain, severity, title, created_utc FROM alerts "
-                    "WHERE run_id=%s AND created_utc >= (NOW() AT TIME ZONE 'UTC') - INTERVAL '2 hours' "
-                    "ORDER BY created_utc DESC LIMIT 200",
-                    (run_db_id,)
-                )
-                alerts = [{"region_id": r[0], "domain": r[1], "severity": r[2], "title": r[3], "created_utc": r[4]} for r in cur.fetchall()]
-                cur.execute("SELECT id, channel, contact_hash, region_id, severity_min, last_sent_utc FROM subscriptions WHERE active=TRUE")
-                subs = cur.fetchall()
-                now = datetime.now(timezone.utc)
-                for sid, channel, chash, region_id, sev_min, last_sent in subs:
-                    matching = [a for a in alerts if a["region_id"] == region_id and a["severity"] >= sev_min]
-                    if not matching:
-                        continue
-                    if last_sent and (now - last_sent) < timedelta(seconds=interval*2):
-                        continue
-                    try:
-                        provider.send(chash, channel, format_alert(matching[0]))
-                        cur.execute("UPDATE subscriptions SET last_sent_utc=%s WHERE id=%s", (now, sid))
-                    except Exception:
+            with conn() as listener, conn() as c:
+                listener.execute(f"LISTEN {RUN_COMPLETED_CHANNEL}")
+                while True:
+                    drain(c, dispatcher, interval, batch_size, lease_sec)
+                    for _ in listener.notifies(timeout=interval, stop_after=1):
                         pass
-        except Exception:
-            pass
-        time.sleep(interval)
+        except psycopg.Error as e:
+            print(f"WARN notifier lost its database connection: {e}")
+            time.sleep(5)
 
 if __name__ == "__main__":
     loop()
@@ -1,19 +1,38 @@
 import os
+class PermanentSendError(RuntimeError):
+    """Delivery can never succeed as configured; the dispatcher does not retry it."""
 class Provider:
+    name = "base"
+    # Gateway limits the dispatcher honours; DISPATCH_CONCURRENCY / DISPATCH_RPS override.
+    max_concurrency = 4
+    max_rps = 0.0  # 0 = unlimited
+    # True if send() takes idempotency_key= and the gateway drops repeats of a key
+    accepts_idempotency_key = False
     def send(self, to_hash: str, channel: str, text: str) -> None:
         raise NotImplementedError
 class MockProvider(Provider):
-    def send(self, to_hash: str, channel: str, text: str) -> None:
-        print(f"[MOCK SEND] channel={channel} to_hash={to_hash} text={text}")
+    name = "mock"
+    accepts_idempotency_key = True
+    def send(self, to_hash: str, channel: str, text: str, idempotency_key: str | None = None) -> None:
+        print(f"[MOCK SEND] channel={channel} to_hash={to_hash} key={idempotency_key} text={text}")
 class NoneProvider(Provider):
+    name = "none"
+    max_concurrency = 16
     def send(self, to_hash: str, channel: str, text: str) -> None:
         return
 class TwilioProvider(Provider):
-    def send(self, to_hash: str, channel: str, text: str) -> None:
-        raise RuntimeError("Twilio adapter stub: store encrypted destination in meta to enable real sending.")
+    name = "twilio"
+    max_concurrency = 10
+    max_rps = 30.0
+    accepts_idempotency_key = True  # sent as the I-Twilio-Idempotency-Token header
+    def send(self, to_hash: str, channel: str, text: str, idempotency_key: str | None = None) -> None:
+        raise PermanentSendError("Twilio adapter stub: store encrypted destination in meta to enable real sending.")
 class AfricasTalkingProvider(Provider):
+    name = "africastalking"
+    max_concurrency = 10
+    max_rps = 20.0
     def send(self, to_hash: str, channel: str, text: str) -> None:
-        raise RuntimeError("Africa's Talking adapter stub: store encrypted destination in meta to enable real sending.")
+        raise PermanentSendError("Africa's Talking adapter stub: store encrypted destination in meta to enable real sending.")
 def get_provider():
     p = os.environ.get("MSG_PROVIDER","mock").lower()
     if p == "none": return NoneProvider()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark region bbox lookups: lat/lon BETWEEN on the idx_regions_latlon
+B-tree vs the idx_regions_point GiST expression (migration 006).
+
+For each box it runs both predicates against POSTGRES_URL under
+EXPLAIN ANALYZE and reports the median server-side execution time, the
+matching cell count and the access path the planner picked. Boxes cover the
+whole of Kenya, two county-sized areas, and a wide-longitude band that the
+B-tree can only narrow by latitude.
+
+--step builds a temporary global grid at that resolution (0.25 -> ~1M cells)
+with the same two indexes, for a production-sized table; by default the live
+regions table is used.
+
+Usage:
+    POSTGRES_URL=... python scripts/bench_bbox_queries.py [--repeat 50] [--step 0.25]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+from pathlib import Path
+
+import psycopg
+
+# Add api + shared packages to path
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "api"))
+sys.path.insert(0, str(ROOT / "shared"))
+
+from api.spatial import bbox_filter  # noqa: E402
+
+# (min_lat, max_lat, min_lon, max_lon)
+BOXES = {
+    "kenya": (-4.7, 5.1, 33.9, 41.95),
+    "turkana": (1.7, 5.0, 34.0, 36.7),
+    "nairobi": (-1.45, -1.16, 36.65, 37.1),
+    "band_5S_5N": (-5.0, 5.0, -180.0, 180.0),
+}
+
+BTREE = " AND r.lat BETWEEN %s AND %s AND r.lon BETWEEN %s AND %s"
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def run(cur, sql, params, repeat):
+    times, rows, access = [], None, None
+    for _ in range(repeat):
+        cur.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + sql, params)
+        result = cur.fetchone()[0][0]
+        times.append(result["Execution Time"])
+        top = result["Plan"]
+        rows = top["Plans"][0]["Actual Rows"] if top.get("Plans") else top["Actual Rows"]
+        access = " / ".join(f"{n['Node Type']} {n.get('Index Name', '')}".strip()
+                            for n in plan_nodes(top) if "Relation Name" in n or "Index Name" in n)
+    return statistics.median(times), rows, access
+
+
+def build_grid(cur, step):
+    cur.execute("""
+        CREATE TEMP TABLE bench_regions AS
+        SELECT 'cell_' || i || '_' || j AS region_id,
+               (-90 + (i + 0.5) * %(step)s)::real AS lat, (-180 + (j + 0.5) * %(step)s)::real AS lon
+        FROM generate_series(0, (180 / %(step)s)::int - 1) i, generate_series(0, (360 / %(step)s)::int - 1) j""",
+                {"step": step})
+    cur.execute("CREATE INDEX ON bench_regions(lat, lon)")
+    cur.execute("CREATE INDEX ON bench_regions USING gist (point(lon, lat))")
+    cur.execute("ANALYZE bench_regions")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=50)
+    ap.add_argument("--step", type=float, help="benchmark a temporary global grid at this resolution (degrees)")
+    a = ap.parse_args()
+    table = "bench_regions" if a.step else "regions"
+    base = f"SELECT r.region_id FROM {table} r WHERE true"
+    with psycopg.connect(os.environ["POSTGRES_URL"], autocommit=True) as c, c.cursor() as cur:
+        if a.step:
+            build_grid(cur, a.step)
+        cur.execute(f"SELECT count(*) FROM {table}")
+        print(f"{table}: {cur.fetchone()[0]} cells")
+        for name, bbox in BOXES.items():
+            gist_sql, gist_params = bbox_filter(bbox)
+            for label, sql, params in (("btree", BTREE, list(bbox)), ("gist", gist_sql, gist_params)):
+                ms, rows, access = run(cur, base + sql, params, a.repeat)
+                print(f"{name:>11} {label:>5}: {ms:7.3f} ms  cells={rows:<6} {access}")
+
+
+if __name__ == "__main__":
+    main()
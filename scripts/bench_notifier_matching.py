@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark notifier matching: per-subscription Python scan vs one SQL join.
+
+Seeds SUBS active subscriptions (tagged meta.bench) on regions of the latest
+run, times one notify cycle each way with a no-op provider, then deletes the
+seeded rows. "join" queues the run in the outbox and delivers it, leaving the
+consumer offset untouched. "scan" is the previous loop body: 200 newest alerts in memory,
+a list comprehension per subscription and one UPDATE per send. The 200 cap
+hides most matches; --scan-alerts 0 scans every alert of the run, which is the
+quadratic cost of doing the same work as the join.
+
+Usage:
+    POSTGRES_URL=... python scripts/bench_notifier_matching.py [--subs 100000] [--scan-alerts 200]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add notifier package to path
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "notifier"))
+
+from notifier.db import conn  # noqa: E402
+from notifier.dispatch import Dispatcher  # noqa: E402
+from notifier.main import ENQUEUE_RUN, deliver  # noqa: E402
+from notifier.providers import NoneProvider  # noqa: E402
+
+INTERVAL = 120
+
+
+def seed(c, n):
+    c.execute("""
+        INSERT INTO subscriptions(created_utc, channel, contact_hash, region_id, severity_min, active, meta)
+        SELECT NOW() AT TIME ZONE 'UTC', 'sms', md5(g::text), ids[1 + (g * 7919) %% cardinality(ids)], 1 + g %% 3, TRUE, '{"bench": true}'
+        FROM generate_series(1, %s) g, (SELECT array_agg(region_id) AS ids FROM regions) r""",
+              (n,))
+    # fresh stats, as autovacuum would have by the time a real cycle runs
+    c.execute("ANALYZE subscriptions")
+
+
+def reset(c):
+    c.execute("UPDATE subscriptions SET last_sent_utc=NULL WHERE meta->>'bench' = 'true'")
+
+
+def scan_cycle(c, provider, alert_cap):
+    cur = c.cursor()
+    cur.execute("SELECT id FROM runs ORDER BY run_time_utc DESC LIMIT 1")
+    run_db_id = cur.fetchone()[0]
+    cur.execute("SELECT region_id, domain, severity, title, created_utc FROM alerts WHERE run_id=%s "
+                "ORDER BY created_utc DESC LIMIT %s", (run_db_id, alert_cap or None))
+    alerts = [{"region_id": r[0], "domain": r[1], "severity": r[2], "title": r[3]} for r in cur.fetchall()]
+    cur.execute("SELECT id, channel, contact_hash, region_id, severity_min FROM subscriptions WHERE active=TRUE")
+    sent = 0
+    for sid, channel, chash, region_id, sev_min in cur.fetchall():
+        matching = [a for a in alerts if a["region_id"] == region_id and a["severity"] >= sev_min]
+        if matching:
+            provider.send(chash, channel, matching[0]["title"])
+            cur.execute("UPDATE subscriptions SET last_sent_utc=NOW() AT TIME ZONE 'UTC' WHERE id=%s", (sid,))
+            sent += 1
+    return sent
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--subs", type=int, default=100000)
+    ap.add_argument("--scan-alerts", type=int, default=200, help="alert cap for the scan; 0 = all")
+    a = ap.parse_args()
+    provider = NoneProvider()
+    with conn() as c:
+        seed(c, a.subs)
+        try:
+            start = time.perf_counter()
+            sent = scan_cycle(c, provider, a.scan_alerts)
+            print(f"scan: {time.perf_counter() - start:7.2f}s  sent={sent} (alert cap {a.scan_alerts or 'none'})")
+            reset(c)
+            start = time.perf_counter()
+            run = c.execute("SELECT id, run_id, run_time_utc FROM runs ORDER BY run_time_utc DESC LIMIT 1").fetchone()
+            queued = c.execute(ENQUEUE_RUN, {"run": run[0], "run_time": run[2]}).rowcount
+            enqueued = time.perf_counter() - start
+            sent, _ = deliver(c, Dispatcher(provider, concurrency=1, rps=0), INTERVAL * 2)
+            print(f"join: {time.perf_counter() - start:7.2f}s  sent={sent} (enqueue {queued} in {enqueued:.2f}s)")
+        finally:
+            c.execute("DELETE FROM outbox WHERE subscription_id IN (SELECT id FROM subscriptions WHERE meta->>'bench' = 'true')")
+            c.execute("DELETE FROM subscriptions WHERE meta->>'bench' = 'true'")
+
+
+if __name__ == "__main__":
+    main()
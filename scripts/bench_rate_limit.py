@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark RateLimitMiddleware: pipelined read-modify-write vs Lua token bucket
+vs in-process buckets synced to Redis in batches.
+
+Drives a bare ASGI app wrapped in the API's RateLimitMiddleware in-process
+(no uvicorn, no Postgres) against REDIS_URL. For each implementation it reports:
+- throughput with an effectively unlimited bucket
+- how many of a concurrent burst get through a small bucket (should equal capacity)
+
+"local" decides in memory, so with a single process its burst result equals
+capacity too; across N replicas the overshoot is bounded by what each can grant
+within one RATE_LIMIT_SYNC_SEC interval.
+
+Usage:
+    REDIS_URL=redis://localhost:6379/0 POSTGRES_URL=unused python scripts/bench_rate_limit.py
+
+Requires: pip install httpx
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+# Add api + shared packages to path
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "api"))
+sys.path.insert(0, str(ROOT / "shared"))
+os.environ.setdefault("POSTGRES_URL", "unused")
+
+import api.middleware as middleware  # noqa: E402
+from api.redis_client import rconn  # noqa: E402
+from api.settings import get_settings  # noqa: E402
+from or_shared import rate_limit  # noqa: E402
+
+IMPLEMENTATIONS = {
+    "pipelined": rate_limit.token_bucket_allow_pipelined_async,
+    "lua": rate_limit.token_bucket_allow_async,
+    "local": rate_limit.token_bucket_allow_async,
+}
+
+
+def make_app():
+    async def ok(request):
+        return PlainTextResponse("ok")
+    app = Starlette(routes=[Route("/", ok)])
+    app.add_middleware(middleware.RateLimitMiddleware)
+    return app
+
+
+async def fire(app, total, concurrency):
+    transport = httpx.ASGITransport(app=app, client=("10.0.0.1", 1234))
+    statuses = {}
+    remaining = iter(range(total))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def user():
+            for _ in remaining:
+                r = await client.get("/")
+                statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+        start = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        return time.perf_counter() - start, statuses
+
+
+async def bench(name, total, concurrency, burst_capacity):
+    middleware.token_bucket_allow_async = IMPLEMENTATIONS[name]
+    settings = get_settings()
+    settings.rate_limit_local = name == "local"
+    app = make_app()
+    r = rconn()
+
+    await r.delete("rl:ip:10.0.0.1")
+    settings.rate_limit_per_minute = 10**9
+    middleware._local = None
+    elapsed, _ = await fire(app, total, concurrency)
+
+    await r.delete("rl:ip:10.0.0.1")
+    settings.rate_limit_per_minute = burst_capacity
+    middleware._local = None
+    _, statuses = await fire(app, burst_capacity * 4, burst_capacity * 4)
+
+    print(f"{name:>10}: {total / elapsed:8.0f} req/s   burst of {burst_capacity * 4} "
+          f"vs capacity {burst_capacity}: {statuses.get(200, 0)} allowed")
+
+
+async def main():
+    total = int(os.environ.get("BENCH_REQUESTS", "5000"))
+    concurrency = int(os.environ.get("BENCH_CONCURRENCY", "50"))
+    for name in IMPLEMENTATIONS:
+        await bench(name, total, concurrency, burst_capacity=50)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark resilience scoring: scalar loop vs vectorized batch.
+
+Generates random input signals for N regions (47 counties up to grid
+cells), scores them with compute_resilience_scores in a Python loop and with
+compute_resilience_scores_batch in one pass, checks both give identical
+values and reports wall time.
+
+Usage:
+    python scripts/bench_scoring.py [--sizes 47 1450 100000] [--batch-only 1000000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from openresilience.scoring import compute_resilience_scores, compute_resilience_scores_batch  # noqa: E402
+
+
+def signals(n: int, seed: int = 42) -> dict:
+    rng = np.random.default_rng(seed)
+    return {
+        "rainfall_anomaly": rng.uniform(-60, 20, n),
+        "soil_moisture": rng.uniform(0.1, 0.8, n),
+        "vegetation_health": rng.uniform(0.2, 0.9, n),
+        "staple_price_change": rng.uniform(-5, 40, n),
+        "market_stockouts": rng.integers(0, 4, n),
+        "field_reports_24h": rng.integers(0, 6, n),
+    }
+
+
+def scalar(s: dict) -> dict:
+    rows = [
+        compute_resilience_scores(
+            rainfall_anomaly=float(ra), soil_moisture=float(sm), vegetation_health=float(vh),
+            staple_price_change=float(pc), market_stockouts=int(ms), field_reports_24h=int(fr),
+        ).to_dict()
+        for ra, sm, vh, pc, ms, fr in zip(*s.values())
+    ]
+    return {name: np.array([r[name] for r in rows]) for name in rows[0]}
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[47, 1450, 100000],
+                    help="regions to score both ways (47 counties, 1450 wards, grid)")
+    ap.add_argument("--batch-only", type=int, nargs="*", default=[1000000],
+                    help="sizes to score with the batch API only")
+    a = ap.parse_args()
+
+    print(f"{'regions':>9} {'scalar':>10} {'batch':>10} {'speedup':>8}")
+    for n in a.sizes:
+        s = signals(n)
+        expected, t_scalar = timed(scalar, s)
+        got, t_batch = timed(lambda: compute_resilience_scores_batch(**s))
+        assert all(np.array_equal(expected[k], got[k]) for k in expected), "batch differs from scalar"
+        print(f"{n:>9} {t_scalar * 1000:>8.1f}ms {t_batch * 1000:>8.2f}ms {t_scalar / t_batch:>7.0f}x")
+    for n in a.batch_only:
+        s = signals(n)
+        _, t_batch = timed(lambda: compute_resilience_scores_batch(**s))
+        print(f"{n:>9} {'-':>10} {t_batch * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
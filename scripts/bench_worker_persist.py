@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Benchmark worker run persistence: row-by-row INSERTs vs COPY.
+
+Runs worker.main.run_once once per persist mode against POSTGRES_URL,
+reports wall time, then deletes the benchmark run (cascades to its rows) and
+restores latest_indicators from the runs that remain.
+
+Usage:
+    POSTGRES_URL=... REDIS_URL=... python scripts/bench_worker_persist.py [rows copy]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add worker + shared packages to path
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "worker"))
+sys.path.insert(0, str(ROOT / "shared"))
+
+from worker.db import conn  # noqa: E402
+from worker.main import run_once  # noqa: E402
+from worker.writers import restore_latest  # noqa: E402
+
+
+def bench(mode: str) -> float:
+    start = time.perf_counter()
+    run_id = run_once(persist_mode=mode)
+    elapsed = time.perf_counter() - start
+    with conn() as c:
+        c.execute("DELETE FROM runs WHERE run_id=%s", (run_id,))
+        restore_latest(c.cursor())
+    return elapsed
+
+
+def main():
+    modes = sys.argv[1:] or ["rows", "copy"]
+    results = {mode: bench(mode) for mode in modes}
+    print("-" * 40)
+    for mode, elapsed in results.items():
+        print(f"{mode:>6}: {elapsed:8.2f}s")
+    if "rows" in results and "copy" in results:
+        print(f"speedup: {results['rows'] / results['copy']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
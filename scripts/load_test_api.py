@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test for the OpenResilience API.
+
+Fires REQUESTS GETs at one endpoint with CONCURRENCY in flight and reports
+throughput, latency percentiles and status codes. Point it at a single
+uvicorn worker to compare sync vs async data access.
+
+Usage:
+    python scripts/load_test_api.py --base http://localhost:8000 \
+        --path "/alerts/latest?limit=50" --requests 2000 --concurrency 200
+
+Requires: pip install httpx
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+
+async def run(base: str, path: str, total: int, concurrency: int, timeout: float):
+    latencies = []
+    statuses = Counter()
+    remaining = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=timeout) as client:
+        async def user():
+            for _ in remaining:
+                start = time.perf_counter()
+                try:
+                    r = await client.get(path)
+                    statuses[r.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    print(f"{path}  requests={total} concurrency={concurrency}")
+    print(f"  throughput: {total / elapsed:8.1f} req/s  ({elapsed:.2f}s)")
+    print(f"  latency ms: p50={pct(0.50):.1f} p95={pct(0.95):.1f} p99={pct(0.99):.1f} "
+          f"mean={statistics.mean(latencies) * 1000:.1f}")
+    print(f"  statuses:   {dict(statuses)}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--base", default="http://localhost:8000")
+    ap.add_argument("--path", default="/alerts/latest?limit=50")
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=200)
+    ap.add_argument("--timeout", type=float, default=30.0)
+    a = ap.parse_args()
+    asyncio.run(run(a.base, a.path, a.requests, a.concurrency, a.timeout))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ Schedule with cron: 0 8 * * 0 (Every Sunday at 8 AM)
 import sys
 import os
 from datetime import datetime
+from itertools import groupby
 
 # Load environment variables
 try:
@@ -19,6 +20,7 @@ except ImportError:
 sys.path.insert(0, 'src')
 
 from openresilience.sms_alerts import SMSAlertService, SubscriptionManager
+from openresilience.sms_templates import Campaign
 
 
 def send_weekly_alerts():
@@ -46,39 +48,34 @@ def send_weekly_alerts():
         print("\n⚠️  No active subscribers. Nothing to send.")
         return
     
-    # Send alerts
-    sent_count = 0
-    failed_count = 0
-    
-    for sub in subscribers:
-        phone = sub['phone']
-        county = sub.get('county', 'Kiambu')
-        language = sub.get('language', 'en')
-        
-        print(f"\n📱 Sending to {phone} ({county}, {language})...")
-        
+    # Subscribers come ordered by county and language, so each group shares
+    # one rendered summary; send_bulk then batches it into shared API calls
+    campaign = Campaign()
+    for (county, language), group in groupby(
+        subscribers, key=lambda sub: (sub.get('county', 'Kiambu'), sub.get('language', 'en'))
+    ):
         # TODO: Get real data from database for this county
         # For now, use sample data
         wsi = 0.53  # Example water stress
         forecast = "Worsening"
         tip = "Harvest rainwater"
         
-        # Send weekly summary
-        result = sms.send_weekly_summary(
-            phone_number=phone,
-            county=county,
-            wsi=wsi,
-            forecast=forecast,
-            tip=tip,
-            language=language
+        campaign.add_group(
+            (sub['phone'] for sub in group), 'weekly_summary', language,
+            county=county, stress_pct=int(wsi*100), forecast=forecast, tip=tip
         )
-        
-        if result.get('success'):
-            print(f"   ✅ Sent successfully")
-            sent_count += 1
-        else:
-            print(f"   ❌ Failed: {result.get('error')}")
-            failed_count += 1
+    
+    plan = campaign.summary()
+    print(f"📨 {plan['messages']} messages, {plan['distinct_texts']} distinct texts, "
+          f"{plan['segments']} segments ({plan['ucs2_messages']} UCS-2)")
+    
+    print(f"\n📱 Sending {plan['messages']} messages in bulk...")
+    result = sms.send_bulk(campaign.recipients())
+    sent_count = result['sent']
+    failed_count = result['failed']
+    
+    for failure in result['failures']:
+        print(f"   ❌ {failure['phone']}: {failure['error']}")
     
     # Summary
     print("\n" + "=" * 60)
@@ -87,9 +84,11 @@ def send_weekly_alerts():
     print(f"✅ Sent: {sent_count}")
     print(f"❌ Failed: {failed_count}")
     print(f"📊 Total: {len(subscribers)}")
+    print(f"📡 API calls: {result['api_calls']}")
     
     if sent_count > 0:
-        cost_estimate = sent_count * 0.80  # KES per SMS
+        # Billed per segment; failures are rare enough to ignore here
+        cost_estimate = plan['segments'] * sent_count / plan['messages'] * 0.80  # KES per segment
         print(f"\n💰 Estimated cost: {cost_estimate:.2f} KES (~${cost_estimate/130:.2f} USD)")
     
     print("=" * 60)
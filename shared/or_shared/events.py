@@ -0,0 +1,7 @@
+# Postgres NOTIFY channel the worker signals after a run commits; payload is the
+# runs.id of the new run. NOTIFY is transactional, so listeners never see a run
+# whose rows are not yet visible.
+RUN_COMPLETED_CHANNEL = "or_run_completed"
+
+def notify_run_completed(cur, run_db_id):
+    cur.execute("SELECT pg_notify(%s, %s)", (RUN_COMPLETED_CHANNEL, str(run_db_id)))
@@ -1,5 +1,116 @@
 import time
+
+from redis.exceptions import ResponseError
+
+# Refill + consume in one atomic server-side step. KEYS[1]=bucket hash,
+# ARGV = capacity, refill_per_sec, now (unix seconds), ttl seconds.
+TOKEN_BUCKET_LUA = """
+local cap = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local b = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(b[1]) or cap
+local ts = tonumber(b[2]) or now
+tokens = math.min(cap, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+return allowed
+"""
+
+# Batched form used by per-process caches: refill, then deduct ARGV[4] tokens
+# already granted locally. The balance may go negative (down to -capacity) so
+# over-admission is paid back before the key is allowed again. Returns the
+# balance as a string, since Lua numbers are truncated to integers on return.
+TOKEN_BUCKET_CONSUME_LUA = """
+local cap = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local b = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(b[1]) or cap
+local ts = tonumber(b[2]) or now
+tokens = math.min(cap, tokens + math.max(0, now - ts) * rate)
+tokens = math.max(-cap, tokens - tonumber(ARGV[4]))
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[5]))
+return tostring(tokens)
+"""
+
+# Script objects per (client class, source); sync and asyncio clients need their
+# own. Each keeps the SHA, calls EVALSHA and re-loads on NOSCRIPT (e.g. after a
+# Redis restart).
+_scripts = {}
+# Set once the server rejects scripting (EVAL disabled by a proxy or ACL);
+# from then on the two-round-trip pipeline version is used.
+_lua_unavailable = False
+
+def _bucket_ttl(capacity, refill_per_sec):
+    return int(max(60, capacity / max(refill_per_sec, 1e-6)))
+
+def _script(redis, source=TOKEN_BUCKET_LUA):
+    k = (type(redis), source)
+    if k not in _scripts:
+        _scripts[k] = redis.register_script(source)
+    return _scripts[k]
+
+def _scripting_rejected(e):
+    msg = str(e).lower()
+    return "unknown command" in msg or "noperm" in msg or "no permissions" in msg or "not allowed" in msg
+
 def token_bucket_allow(redis, key, capacity, refill_per_sec):
+    global _lua_unavailable
+    if not _lua_unavailable:
+        try:
+            return bool(_script(redis)(keys=[key], args=[capacity, refill_per_sec, time.time(), _bucket_ttl(capacity, refill_per_sec)], client=redis))
+        except ResponseError as e:
+            if not _scripting_rejected(e):
+                raise
+            _lua_unavailable = True
+    return token_bucket_allow_pipelined(redis, key, capacity, refill_per_sec)
+
+async def token_bucket_allow_async(redis, key, capacity, refill_per_sec):
+    """token_bucket_allow for redis.asyncio clients."""
+    global _lua_unavailable
+    if not _lua_unavailable:
+        try:
+            return bool(await _script(redis)(keys=[key], args=[capacity, refill_per_sec, time.time(), _bucket_ttl(capacity, refill_per_sec)], client=redis))
+        except ResponseError as e:
+            if not _scripting_rejected(e):
+                raise
+            _lua_unavailable = True
+    return await token_bucket_allow_pipelined_async(redis, key, capacity, refill_per_sec)
+
+async def token_bucket_consume_many_async(redis, consumed, capacity, refill_per_sec):
+    """Deduct already-granted tokens from many buckets in one pipelined round trip.
+
+    `consumed` maps bucket key -> tokens granted locally since the last call.
+    Returns key -> global balance left after the deduction.
+    """
+    global _lua_unavailable
+    keys = list(consumed)
+    if not keys:
+        return {}
+    if not _lua_unavailable:
+        now = time.time()
+        ttl = _bucket_ttl(capacity, refill_per_sec)
+        script = _script(redis, TOKEN_BUCKET_CONSUME_LUA)
+        pipe = redis.pipeline(transaction=False)
+        for k in keys:
+            await script(keys=[k], args=[capacity, refill_per_sec, now, consumed[k], ttl], client=pipe)
+        try:
+            return {k: float(v) for k, v in zip(keys, await pipe.execute())}
+        except ResponseError as e:
+            if not _scripting_rejected(e):
+                raise
+            _lua_unavailable = True
+    return await token_bucket_consume_many_pipelined_async(redis, consumed, capacity, refill_per_sec)
+
+def token_bucket_allow_pipelined(redis, key, capacity, refill_per_sec):
+    """Read-modify-write fallback: two round trips, not atomic under concurrency."""
     now = time.time()
     pipe = redis.pipeline()
     pipe.hget(key, "tokens")
@@ -14,6 +125,47 @@ def token_bucket_allow(redis, key, capacity, refill_per_sec):
         tokens -= 1.0
     pipe = redis.pipeline()
     pipe.hset(key, mapping={"tokens": tokens, "ts": now})
-    pipe.expire(key, int(max(60, capacity / max(refill_per_sec, 1e-6))))
+    pipe.expire(key, _bucket_ttl(capacity, refill_per_sec))
     pipe.execute()
     return allowed
+
+async def token_bucket_allow_pipelined_async(redis, key, capacity, refill_per_sec):
+    """token_bucket_allow_pipelined for redis.asyncio clients."""
+    now = time.time()
+    pipe = redis.pipeline()
+    pipe.hget(key, "tokens")
+    pipe.hget(key, "ts")
+    tokens_s, ts_s = await pipe.execute()
+    tokens = float(tokens_s) if tokens_s is not None else float(capacity)
+    ts = float(ts_s) if ts_s is not None else now
+    elapsed = max(0.0, now - ts)
+    tokens = min(float(capacity), tokens + elapsed * refill_per_sec)
+    allowed = tokens >= 1.0
+    if allowed:
+        tokens -= 1.0
+    pipe = redis.pipeline()
+    pipe.hset(key, mapping={"tokens": tokens, "ts": now})
+    pipe.expire(key, _bucket_ttl(capacity, refill_per_sec))
+    await pipe.execute()
+    return allowed
+
+async def token_bucket_consume_many_pipelined_async(redis, consumed, capacity, refill_per_sec):
+    """token_bucket_consume_many_async without Lua: two round trips for all keys, not atomic under concurrency."""
+    keys = list(consumed)
+    now = time.time()
+    pipe = redis.pipeline()
+    for k in keys:
+        pipe.hmget(k, "tokens", "ts")
+    balances = {}
+    for k, (tokens_s, ts_s) in zip(keys, await pipe.execute()):
+        tokens = float(tokens_s) if tokens_s is not None else float(capacity)
+        ts = float(ts_s) if ts_s is not None else now
+        tokens = min(float(capacity), tokens + max(0.0, now - ts) * refill_per_sec)
+        balances[k] = max(-float(capacity), tokens - consumed[k])
+    ttl = _bucket_ttl(capacity, refill_per_sec)
+    pipe = redis.pipeline()
+    for k in keys:
+        pipe.hset(k, mapping={"tokens": balances[k], "ts": now})
+        pipe.expire(k, ttl)
+    await pipe.execute()
+    return balances
@@ -6,12 +6,14 @@ SQLite-based storage for:
 - Scoring runs (historical index calculations)
 - Field reports (ground truth from communities)
 - Alerts (threshold-based notifications)
+- SMS subscriptions (farmers receiving county alerts)
 
 Design: Local-first, zero-infrastructure, portable
 """
 
 import sqlite3
 import shutil
+from collections.abc import Iterable, Mapping
 from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
@@ -191,6 +193,21 @@ def init_database(db_path: str = DEFAULT_DB_PATH, force_recreate: bool = False)
         CREATE INDEX IF NOT EXISTS idx_alerts_region_time ON alerts(region_id, timestamp);
         CREATE INDEX IF NOT EXISTS idx_alerts_level ON alerts(level);
         CREATE INDEX IF NOT EXISTS idx_alerts_ack ON alerts(acknowledged);
+        
+        CREATE TABLE IF NOT EXISTS sms_subscriptions (
+            phone TEXT PRIMARY KEY,
+            county TEXT NOT NULL,
+            language TEXT NOT NULL DEFAULT 'en',
+            active INTEGER NOT NULL DEFAULT 1,
+            subscribed_at TEXT NOT NULL,
+            unsubscribed_at TEXT
+        );
+        
+        -- Campaign fan-out reads only active rows, by county (and language)
+        CREATE INDEX IF NOT EXISTS idx_sms_subs_county
+            ON sms_subscriptions(county, language) WHERE active = 1;
+        CREATE INDEX IF NOT EXISTS idx_sms_subs_language
+            ON sms_subscriptions(language) WHERE active = 1;
         """)
         conn.commit()
 
@@ -302,6 +319,68 @@ def insert_run(
         return cur.lastrowid
 
 
+def insert_county_runs(
+    county_runs: Iterable[Mapping[str, Any]],
+    timestamp: Optional[str] = None,
+    notes: str = "",
+    db_path: str = DEFAULT_DB_PATH
+) -> int:
+    """
+    Record one scoring pass over many counties in a single transaction.
+    
+    Counties not yet in the regions table are added. Readers that poll
+    get_latest_run_id() see the pass only once every county is written.
+    
+    Args:
+        county_runs: One dict per county with 'county', the input signals and
+            wsi, fsi, msi, cri, confidence; optional 'latitude', 'longitude',
+            'population' and 'data_mode'
+        timestamp: ISO timestamp shared by every run (defaults to now)
+        notes: Optional notes about this pass
+        db_path: Database file path
+    
+    Returns:
+        Number of runs recorded
+    """
+    if timestamp is None:
+        timestamp = datetime.now().isoformat()
+    
+    count = 0
+    with get_connection(db_path) as conn:
+        for run in county_runs:
+            conn.execute(
+                """INSERT OR IGNORE INTO regions (name, level, latitude, longitude, population)
+                   VALUES (?, 'county', ?, ?, ?)""",
+                (run["county"], run.get("latitude"), run.get("longitude"), run.get("population"))
+            )
+            conn.execute(
+                """INSERT INTO runs (
+                    region_id, timestamp,
+                    rainfall_anomaly, soil_moisture, vegetation_health,
+                    staple_price_change, market_stockouts, field_reports_24h,
+                    wsi, fsi, msi, cri, confidence,
+                    notes, data_mode
+                ) SELECT id, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+                  FROM regions WHERE name = ?""",
+                (
+                    timestamp,
+                    float(run.get("rainfall_anomaly", 0.0)),
+                    float(run.get("soil_moisture", 0.5)),
+                    float(run.get("vegetation_health", 0.7)),
+                    float(run.get("staple_price_change", 0.0)),
+                    int(run.get("market_stockouts", 0)),
+                    int(run.get("field_reports_24h", 0)),
+                    float(run["wsi"]), float(run["fsi"]), float(run["msi"]),
+                    float(run["cri"]), float(run["confidence"]),
+                    notes, run.get("data_mode", "demo"),
+                    run["county"]
+                )
+            )
+            count += 1
+        conn.commit()
+    return count
+
+
 def get_recent_runs(
     region_id: int,
     limit: int = 10,
@@ -477,16 +556,159 @@ def get_active_alerts(
         return [dict(row) for row in cur.fetchall()]
 
 
+def get_latest_county_scores(db_path: str = DEFAULT_DB_PATH) -> Dict[str, Dict[str, Any]]:
+    """
+    Retrieve the most recent scoring run of every county.
+    
+    Args:
+        db_path: Database file path
+    
+    Returns:
+        Dict of county name -> run dictionary (wsi, fsi, msi, cri, confidence, timestamp)
+    """
+    with get_connection(db_path) as conn:
+        cur = conn.execute(
+            """SELECT g.name, r.id, r.wsi, r.fsi, r.msi, r.cri, r.confidence, r.timestamp
+               FROM regions g
+               JOIN runs r ON r.id = (
+                   SELECT id FROM runs
+                   WHERE region_id = g.id
+                   ORDER BY timestamp DESC, id DESC
+                   LIMIT 1
+               )
+               WHERE g.level = 'county'"""
+        )
+        return {row["name"]: dict(row) for row in cur.fetchall()}
+
+
+def get_latest_run_id(db_path: str = DEFAULT_DB_PATH) -> Optional[int]:
+    """
+    Return the newest run ID, a cheap marker for "a scoring run happened".
+    
+    Args:
+        db_path: Database file path
+    
+    Returns:
+        Highest run ID, or None if no runs are recorded
+    """
+    with get_connection(db_path) as conn:
+        return conn.execute("SELECT MAX(id) FROM runs").fetchone()[0]
+
+
+def upsert_subscription(
+    phone: str,
+    county: str,
+    language: str = "en",
+    timestamp: Optional[str] = None,
+    db_path: str = DEFAULT_DB_PATH
+) -> None:
+    """
+    Subscribe a phone number, or move an existing one to a new county/language.
+    
+    Args:
+        phone: Normalized phone number
+        county: County to monitor
+        language: 'en' or 'sw'
+        timestamp: ISO timestamp (defaults to now)
+        db_path: Database file path
+    """
+    if timestamp is None:
+        timestamp = datetime.now().isoformat()
+    
+    with get_connection(db_path) as conn:
+        conn.execute(
+            """INSERT INTO sms_subscriptions (phone, county, language, active, subscribed_at)
+               VALUES (?, ?, ?, 1, ?)
+               ON CONFLICT(phone) DO UPDATE SET
+                   county = excluded.county,
+                   language = excluded.language,
+                   active = 1,
+                   subscribed_at = excluded.subscribed_at,
+                   unsubscribed_at = NULL""",
+            (phone, county, language, timestamp)
+        )
+        conn.commit()
+
+
+def deactivate_subscription(
+    phone: str,
+    timestamp: Optional[str] = None,
+    db_path: str = DEFAULT_DB_PATH
+) -> bool:
+    """
+    Mark a subscription inactive, keeping the row for history.
+    
+    Args:
+        phone: Normalized phone number
+        timestamp: ISO timestamp (defaults to now)
+        db_path: Database file path
+    
+    Returns:
+        True if the phone had a subscription
+    """
+    if timestamp is None:
+        timestamp = datetime.now().isoformat()
+    
+    with get_connection(db_path) as conn:
+        cur = conn.execute(
+            """UPDATE sms_subscriptions SET active = 0, unsubscribed_at = ?
+               WHERE phone = ?""",
+            (timestamp, phone)
+        )
+        conn.commit()
+        return cur.rowcount > 0
+
+
+def get_active_subscriptions(
+    county: Optional[str] = None,
+    language: Optional[str] = None,
+    db_path: str = DEFAULT_DB_PATH
+) -> List[Dict[str, Any]]:
+    """
+    Retrieve active SMS subscriptions through the county/language indexes.
+    
+    Args:
+        county: Optional county filter
+        language: Optional language filter
+        db_path: Database file path
+    
+    Returns:
+        List of subscription dictionaries, grouped by county and language
+    """
+    with get_connection(db_path) as conn:
+        query = "SELECT * FROM sms_subscriptions WHERE active = 1"
+        params = []
+        
+        if county is not None:
+            query += " AND county = ?"
+            params.append(county)
+        
+        if language is not None:
+            query += " AND language = ?"
+            params.append(language)
+        
+        query += " ORDER BY county, language"
+        
+        cur = conn.execute(query, params)
+        return [dict(row) for row in cur.fetchall()]
+
+
 # Export main functions
 __all__ = [
     "init_database",
     "get_connection",
     "ensure_region",
     "insert_run",
+    "insert_county_runs",
     "get_recent_runs",
     "insert_field_report",
     "get_recent_reports",
     "create_alert",
     "get_active_alerts",
+    "get_latest_county_scores",
+    "get_latest_run_id",
+    "upsert_subscription",
+    "deactivate_subscription",
+    "get_active_subscriptions",
     "DEFAULT_DB_PATH",
 ]
@@ -8,11 +8,19 @@ Provides algorithmic assessment across four resilience dimensions:
 - CRI: Composite Risk Index
 
 All indices use 0-100 scale where higher = more stress/risk.
+
+Each index has a scalar function (one region at a time) and a vectorized
+batch form (`compute_resilience_scores_batch`, `score_dataframe`) for
+ward- or grid-level scoring of many regions in one NumPy pass. The batch
+form gives bit-for-bit the same values as the scalar functions.
 """
 
 from dataclasses import dataclass
 from typing import Dict, Any
 
+import numpy as np
+import pandas as pd
+
 
 @dataclass
 class ResilienceScores:
@@ -328,10 +336,140 @@ def compute_resilience_scores(
     )
 
 
+# Input signals and their defaults, as in compute_resilience_scores
+SIGNAL_DEFAULTS = {
+    "rainfall_anomaly": 0.0,
+    "soil_moisture": 0.5,
+    "vegetation_health": 0.7,
+    "staple_price_change": 0.0,
+    "market_stockouts": 0,
+    "field_reports_24h": 0,
+}
+
+
+def clamp_array(values: np.ndarray, minimum: float = 0.0, maximum: float = 100.0) -> np.ndarray:
+    """
+    Elementwise `clamp`, with the same comparisons as the scalar version.
+    
+    Unlike np.clip this reproduces clamp() exactly for every input,
+    including NaN (which clamp() maps to `maximum`) and -0.0.
+    
+    Args:
+        values: Array to clamp
+        minimum: Lower bound (default 0.0)
+        maximum: Upper bound (default 100.0)
+    
+    Returns:
+        Clamped array
+    """
+    values = np.where(values < maximum, values, maximum)
+    return np.where(values > minimum, values, minimum)
+
+
+def compute_resilience_scores_batch(
+    rainfall_anomaly=SIGNAL_DEFAULTS["rainfall_anomaly"],
+    soil_moisture=SIGNAL_DEFAULTS["soil_moisture"],
+    vegetation_health=SIGNAL_DEFAULTS["vegetation_health"],
+    staple_price_change=SIGNAL_DEFAULTS["staple_price_change"],
+    market_stockouts=SIGNAL_DEFAULTS["market_stockouts"],
+    field_reports_24h=SIGNAL_DEFAULTS["field_reports_24h"],
+) -> Dict[str, np.ndarray]:
+    """
+    Compute all resilience indices for many regions in one vectorized pass.
+    
+    Arguments are arrays (or scalars, which broadcast) of the same signals
+    as compute_resilience_scores. Every result equals, bit for bit, what the
+    scalar functions return for the same row.
+    
+    Args:
+        rainfall_anomaly: % deviation from normal (-100 to +100)
+        soil_moisture: Soil moisture ratio (0-1)
+        vegetation_health: Vegetation index (0-1, NDVI-like)
+        staple_price_change: % change in food prices (-100 to +100)
+        market_stockouts: Count of unavailable staples (0-5)
+        field_reports_24h: Ground truth reports in last 24h
+    
+    Returns:
+        Dict of float arrays: wsi, fsi, msi, cri, confidence
+    
+    Example:
+        >>> scores = compute_resilience_scores_batch(
+        ...     rainfall_anomaly=[-45, 5],
+        ...     soil_moisture=[0.25, 0.6],
+        ...     vegetation_health=[0.35, 0.8],
+        ... )
+        >>> scores["cri"].round(1)
+        array([43.8, 13.5])
+    """
+    rainfall_anomaly, soil_moisture, vegetation_health, staple_price_change, \
+        market_stockouts, field_reports_24h = np.broadcast_arrays(
+            *(np.asarray(signal, dtype=float) for signal in (
+                rainfall_anomaly, soil_moisture, vegetation_health,
+                staple_price_change, market_stockouts, field_reports_24h
+            ))
+        )
+    
+    # Same formulas, weights and operation order as the scalar functions
+    rainfall_deficit = clamp_array(-rainfall_anomaly, 0, 100)
+    soil_dryness = clamp_array((1 - soil_moisture) * 100, 0, 100)
+    wsi = clamp_array(0.55 * rainfall_deficit + 0.45 * soil_dryness)
+    
+    vegetation_decline = clamp_array((1 - vegetation_health) * 100, 0, 100)
+    report_signal = clamp_array(field_reports_24h * 12, 0, 100)
+    fsi = clamp_array(
+        0.50 * vegetation_decline +
+        0.30 * wsi +
+        0.20 * report_signal
+    )
+    
+    price_stress = clamp_array(staple_price_change, 0, 100)
+    availability_stress = clamp_array(market_stockouts * 20, 0, 100)
+    msi = clamp_array(0.70 * price_stress + 0.30 * availability_stress)
+    
+    cri = clamp_array(0.45 * wsi + 0.35 * fsi + 0.20 * msi)
+    
+    aligned = (
+        (rainfall_anomaly < -20).astype(int) +
+        (soil_moisture < 0.35) +
+        (vegetation_health < 0.45) +
+        (field_reports_24h >= 2)
+    )
+    confidence = clamp_array((aligned / 4.0) * 100)
+    
+    return {"wsi": wsi, "fsi": fsi, "msi": msi, "cri": cri, "confidence": confidence}
+
+
+def score_dataframe(signals: pd.DataFrame) -> pd.DataFrame:
+    """
+    Score every row of a DataFrame of input signals.
+    
+    Columns are named after the compute_resilience_scores arguments;
+    missing columns take the same defaults.
+    
+    Args:
+        signals: One row per region (county, ward or grid cell)
+    
+    Returns:
+        DataFrame with wsi, fsi, msi, cri, confidence columns and the
+        same index as `signals`
+    """
+    columns = {
+        name: signals[name].to_numpy() if name in signals else default
+        for name, default in SIGNAL_DEFAULTS.items()
+    }
+    scores = compute_resilience_scores_batch(**columns)
+    return pd.DataFrame(
+        {name: np.broadcast_to(values, len(signals)) for name, values in scores.items()},
+        index=signals.index
+    )
+
+
 # Export main components
 __all__ = [
     "ResilienceScores",
     "compute_resilience_scores",
+    "compute_resilience_scores_batch",
+    "score_dataframe",
     "compute_water_stress",
     "compute_food_stress",
     "compute_market_stress",
@@ -14,9 +14,22 @@ Uses Africa's Talking API - Kenya's leading SMS platform
 
 import os
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterable, Optional, Tuple
 import hashlib
 
+from .database import (
+    DEFAULT_DB_PATH,
+    deactivate_subscription,
+    get_active_subscriptions,
+    init_database,
+    upsert_subscription,
+)
+from .sms_templates import registry, stress_level as stress_level_name
+
+
+# Recipients per Africa's Talking bulk request
+BULK_CHUNK_SIZE = 1000
+
 
 class SMSAlertService:
     """
@@ -35,6 +48,8 @@ class SMSAlertService:
             username: Africa's Talking username (or from environment)
         """
         self.api_key = api_key or os.getenv('AFRICASTALKING_API_KEY')
+        # Optional StatusReplyCache answering STATUS/HALI queries
+        self.status_replies = None
         self.username = username or os.getenv('AFRICASTALKING_USERNAME', 'sandbox')
         
         # Initialize Africa's Talking
@@ -96,6 +111,89 @@ class SMSAlertService:
                 'message': message
             }
     
+    def send_bulk(
+        self,
+        recipients: Iterable[Tuple[str, str]],
+        chunk_size: int = BULK_CHUNK_SIZE
+    ) -> Dict[str, any]:
+        """
+        Send alerts to many recipients with as few API calls as possible.
+        
+        Recipients are grouped by identical message text, and each group is
+        sent in chunks of up to `chunk_size` numbers per request. A weekly
+        campaign rendered per (county, language, level) therefore costs about
+        N / chunk_size calls instead of N. Duplicate numbers within a group
+        are sent once.
+        
+        Args:
+            recipients: Iterable of (phone_number, message) pairs
+            chunk_size: Maximum recipients per API call
+        
+        Returns:
+            Dict with sent/failed counts, API calls made and failed numbers
+        """
+        groups = {}  # message -> {phone: None}, insertion-ordered
+        for phone_number, message in recipients:
+            groups.setdefault(message, {})[self._format_kenyan_number(phone_number)] = None
+        total = sum(len(phones) for phones in groups.values())
+        
+        if not self.available:
+            return {
+                'success': False,
+                'error': 'SMS service not available',
+                'sent': 0,
+                'failed': total,
+                'api_calls': 0,
+                'failures': []
+            }
+        
+        sent = 0
+        api_calls = 0
+        failures = []
+        for message, phones in groups.items():
+            phones = list(phones)
+            for start in range(0, len(phones), chunk_size):
+                chunk = phones[start:start + chunk_size]
+                api_calls += 1
+                try:
+                    response = self.sms.send(message, chunk)
+                except Exception as e:
+                    failures.extend({'phone': phone, 'error': str(e)} for phone in chunk)
+                    continue
+                chunk_failures = self._bulk_failures(response)
+                failures.extend(chunk_failures)
+                sent += len(chunk) - len(chunk_failures)
+        
+        return {
+            'success': not failures,
+            'sent': sent,
+            'failed': len(failures),
+            'api_calls': api_calls,
+            'failures': failures,
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    @staticmethod
+    def _bulk_failures(response) -> List[Dict[str, str]]:
+        """
+        Extract rejected recipients from an Africa's Talking send response.
+        
+        Args:
+            response: Response dict from `SMS.send`
+        
+        Returns:
+            List of {'phone', 'error'} dicts; empty if all were accepted
+        """
+        try:
+            recipients = response['SMSMessageData']['Recipients']
+        except (KeyError, TypeError):
+            return []
+        return [
+            {'phone': r.get('number'), 'error': r.get('status')}
+            for r in recipients
+            if r.get('status') != 'Success'
+        ]
+    
     def send_water_stress_alert(
         self,
         phone_number: str,
@@ -117,42 +215,10 @@ class SMSAlertService:
         Returns:
             Send status
         """
-        if language == 'sw':
-            # Kiswahili message
-            if stress_level >= 0.7:
-                status = "DHARURA"  # Emergency
-                emoji = "🔴"
-            elif stress_level >= 0.5:
-                status = "HATARI"  # Danger
-                emoji = "🟠"
-            else:
-                status = "WASTANI"  # Moderate
-                emoji = "🟡"
-            
-            message = (
-                f"{emoji} OPENRESILIENCE\n"
-                f"{county}: {status}\n"
-                f"Hatua: {action}\n"
-                f"Tuma STOP kwa 22555 kusitisha"
-            )
-        else:
-            # English message
-            if stress_level >= 0.7:
-                status = "CRITICAL"
-                emoji = "🔴"
-            elif stress_level >= 0.5:
-                status = "HIGH"
-                emoji = "🟠"
-            else:
-                status = "MODERATE"
-                emoji = "🟡"
-            
-            message = (
-                f"{emoji} OPENRESILIENCE\n"
-                f"{county}: {status}\n"
-                f"Action: {action}\n"
-                f"SMS STOP to 22555 to unsubscribe"
-            )
+        message = registry.render(
+            'water_stress', language,
+            county=county, level=stress_level_name(stress_level), action=action
+        ).text
         
         return self.send_alert(phone_number, message, county)
     
@@ -178,21 +244,7 @@ class SMSAlertService:
             Send status
         """
         crops = ", ".join(recommended_crops[:3])  # Max 3 crops to fit SMS
-        
-        if language == 'sw':
-            message = (
-                f"🌱 MSIMU WA KUPANDA\n"
-                f"{county}: {season}\n"
-                f"Panda: {crops}\n"
-                f"OpenResilience Kenya"
-            )
-        else:
-            message = (
-                f"🌱 PLANTING SEASON\n"
-                f"{county}: {season}\n"
-                f"Plant: {crops}\n"
-                f"OpenResilience Kenya"
-            )
+        message = registry.render('planting_reminder', language, county=county, season=season, crops=crops).text
         
         return self.send_alert(phone_number, message, county)
     
@@ -217,22 +269,7 @@ class SMSAlertService:
         Returns:
             Send status
         """
-        if language == 'sw':
-            message = (
-                f"🚛 LORI LA MAJI\n"
-                f"Mahali: {location}\n"
-                f"Saa: {time}\n"
-                f"Bei: {cost}\n"
-                f"OpenResilience"
-            )
-        else:
-            message = (
-                f"🚛 WATER TRUCK\n"
-                f"Location: {location}\n"
-                f"Time: {time}\n"
-                f"Cost: {cost}\n"
-                f"OpenResilience"
-            )
+        message = registry.render('water_truck', language, location=location, time=time, cost=cost).text
         
         return self.send_alert(phone_number, message)
     
@@ -259,25 +296,35 @@ class SMSAlertService:
         Returns:
             Send status
         """
-        if language == 'sw':
-            message = (
-                f"📊 RIPOTI YA WIKI\n"
-                f"{county}: Shinikizo {int(wsi*100)}%\n"
-                f"Ubashiri: {forecast}\n"
-                f"Ushauri: {tip}\n"
-                f"OpenResilience"
-            )
-        else:
-            message = (
-                f"📊 WEEKLY SUMMARY\n"
-                f"{county}: Stress {int(wsi*100)}%\n"
-                f"Forecast: {forecast}\n"
-                f"Tip: {tip}\n"
-                f"OpenResilience"
-            )
-        
+        message = self.format_weekly_summary(county, wsi, forecast, tip, language)
         return self.send_alert(phone_number, message, county)
     
+    def format_weekly_summary(
+        self,
+        county: str,
+        wsi: float,
+        forecast: str,
+        tip: str,
+        language: str = 'en'
+    ) -> str:
+        """
+        Render the weekly summary text without sending it.
+        
+        Args:
+            county: County name
+            wsi: Water Stress Index
+            forecast: Short forecast
+            tip: Water-saving tip
+            language: 'en' or 'sw'
+        
+        Returns:
+            SMS text
+        """
+        return registry.render(
+            'weekly_summary', language,
+            county=county, stress_pct=int(wsi*100), forecast=forecast, tip=tip
+        ).text
+    
     def _format_kenyan_number(self, phone: str) -> str:
         """
         Format phone number to Kenya format (+254...).
@@ -312,6 +359,7 @@ class SMSAlertService:
         - STOP: Unsubscribe
         - HELP: Get help
         - STATUS <county>: Get current status
+        - HALI <county>: Get current status in Kiswahili
         
         Args:
             from_number: Sender phone number
@@ -358,16 +406,20 @@ class SMSAlertService:
                 )
             }
         
-        elif text_upper.startswith('STATUS'):
-            # Extract county name
-            parts = text_upper.split()
+        elif text_upper.startswith('STATUS') or text_upper.startswith('HALI'):
+            # Extract county name (may be several words, e.g. TAITA TAVETA)
+            parts = text_upper.split(maxsplit=1)
             county = parts[1] if len(parts) > 1 else None
+            language = 'sw' if parts[0] == 'HALI' else 'en'
             
             return {
                 'command': 'status_request',
                 'phone': phone,
                 'county': county,
-                'response': None  # Will be filled by app with real data
+                'language': language,
+                # From the per-run reply cache when attached; otherwise
+                # filled by the app with real data
+                'response': self.status_replies.reply(county, language) if self.status_replies else None
             }
         
         else:
@@ -382,16 +434,25 @@ class SMSAlertService:
             }
 
 
-# Subscription database (in production, use real database)
 class SubscriptionManager:
     """
     Manages SMS subscriptions.
     
-    In production, use PostgreSQL or similar.
+    Subscriptions persist in the SQLite database (`sms_subscriptions`), so
+    they survive webhook restarts and are shared with the weekly alert
+    script. Active rows are indexed by county and language, which keeps
+    county fan-out an index lookup at hundreds of thousands of farmers.
     """
     
-    def __init__(self):
-        self.subscriptions = {}  # phone -> {county, language, active}
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        """
+        Open (and if needed create) the subscription store.
+        
+        Args:
+            db_path: Path to SQLite database file
+        """
+        self.db_path = db_path
+        init_database(db_path)
     
     def subscribe(
         self,
@@ -410,12 +471,7 @@ class SubscriptionManager:
         Returns:
             Success status
         """
-        self.subscriptions[phone] = {
-            'county': county,
-            'language': language,
-            'active': True,
-            'subscribed_at': datetime.now().isoformat()
-        }
+        upsert_subscription(phone, county, language, db_path=self.db_path)
         return True
     
     def unsubscribe(self, phone: str) -> bool:
@@ -428,11 +484,7 @@ class SubscriptionManager:
         Returns:
             Success status
         """
-        if phone in self.subscriptions:
-            self.subscriptions[phone]['active'] = False
-            self.subscriptions[phone]['unsubscribed_at'] = datetime.now().isoformat()
-            return True
-        return False
+        return deactivate_subscription(phone, db_path=self.db_path)
     
     def get_subscribers_for_county(self, county: str) -> List[Dict]:
         """
@@ -444,11 +496,7 @@ class SubscriptionManager:
         Returns:
             List of subscriber dicts
         """
-        return [
-            {'phone': phone, **data}
-            for phone, data in self.subscriptions.items()
-            if data.get('active') and data.get('county') == county
-        ]
+        return [self._subscriber(row) for row in get_active_subscriptions(county, db_path=self.db_path)]
     
     def get_all_active_subscribers(self) -> List[Dict]:
         """
@@ -457,11 +505,13 @@ class SubscriptionManager:
         Returns:
             List of subscriber dicts
         """
-        return [
-            {'phone': phone, **data}
-            for phone, data in self.subscriptions.items()
-            if data.get('active')
-        ]
+        return [self._subscriber(row) for row in get_active_subscriptions(db_path=self.db_path)]
+    
+    @staticmethod
+    def _subscriber(row: Dict) -> Dict:
+        """Shape a stored row like the subscriber dicts callers expect."""
+        row['active'] = bool(row['active'])
+        return row
 
 
 # Export
@@ -0,0 +1,343 @@
+"""
+SMS Message Templates for OpenResilience Kenya
+
+Bilingual (English / Kiswahili) alert texts, compiled once and rendered once
+per distinct message rather than once per recipient.
+
+Features:
+- Template registry keyed by (template, language)
+- Render cache (LRU): a campaign renders each (county, language, level) text once
+- GSM-7 vs UCS-2 detection and segment counts before anything is sent
+
+Segment rules (3GPP TS 23.038): GSM-7 fits 160 septets in one SMS and 153
+per part when concatenated; extension characters such as € cost two
+septets. Any character outside GSM-7 (every emoji) switches the whole
+message to UCS-2: 70 UTF-16 code units in one SMS, 67 per part.
+"""
+
+import math
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+# GSM 03.38 default alphabet (ESC excluded) and its extension table
+GSM7_BASIC = frozenset(
+    "@£$¥èéùìòÇ\nØø\rÅåΔ_ΦΓΛΩΠΨΣΘΞÆæßÉ !\"#¤%&'()*+,-./0123456789:;<=>?"
+    "¡ABCDEFGHIJKLMNOPQRSTUVWXYZÄÖÑÜ§¿abcdefghijklmnopqrstuvwxyzäöñüà"
+)
+GSM7_EXTENDED = frozenset("^{}\\[~]|€\f")
+
+# Single-message capacity and per-part capacity when concatenated
+SEGMENT_LIMITS = {
+    'GSM-7': (160, 153),
+    'UCS-2': (70, 67),
+}
+
+# Rendered messages kept per registry; free-text fields (locations, tips)
+# would otherwise grow the cache without limit
+RENDER_CACHE_SIZE = 4096
+
+# Water stress (0-1) thresholds, highest first
+STRESS_LEVELS = ((0.7, 'critical'), (0.5, 'high'), (0.0, 'moderate'))
+
+# (emoji, status word) per stress level and language
+LEVEL_LABELS = {
+    'en': {
+        'critical': ("🔴", "CRITICAL"),
+        'high': ("🟠", "HIGH"),
+        'moderate': ("🟡", "MODERATE"),
+    },
+    'sw': {
+        'critical': ("🔴", "DHARURA"),  # Emergency
+        'high': ("🟠", "HATARI"),  # Danger
+        'moderate': ("🟡", "WASTANI"),  # Moderate
+    },
+}
+
+TEMPLATES = {
+    ('water_stress', 'en'): (
+        "{emoji} OPENRESILIENCE\n"
+        "{county}: {status}\n"
+        "Action: {action}\n"
+        "SMS STOP to 22555 to unsubscribe"
+    ),
+    ('water_stress', 'sw'): (
+        "{emoji} OPENRESILIENCE\n"
+        "{county}: {status}\n"
+        "Hatua: {action}\n"
+        "Tuma STOP kwa 22555 kusitisha"
+    ),
+    ('planting_reminder', 'en'): (
+        "🌱 PLANTING SEASON\n"
+        "{county}: {season}\n"
+        "Plant: {crops}\n"
+        "OpenResilience Kenya"
+    ),
+    ('planting_reminder', 'sw'): (
+        "🌱 MSIMU WA KUPANDA\n"
+        "{county}: {season}\n"
+        "Panda: {crops}\n"
+        "OpenResilience Kenya"
+    ),
+    ('water_truck', 'en'): (
+        "🚛 WATER TRUCK\n"
+        "Location: {location}\n"
+        "Time: {time}\n"
+        "Cost: {cost}\n"
+        "OpenResilience"
+    ),
+    ('water_truck', 'sw'): (
+        "🚛 LORI LA MAJI\n"
+        "Mahali: {location}\n"
+        "Saa: {time}\n"
+        "Bei: {cost}\n"
+        "OpenResilience"
+    ),
+    ('status_reply', 'en'): (
+        "{emoji} {county_upper}\n"
+        "Water Stress: {stress_pct}% ({status})\n"
+        "Action: {action}\n"
+        "OpenResilience Kenya"
+    ),
+    ('status_reply', 'sw'): (
+        "{emoji} {county_upper}\n"
+        "Shinikizo la Maji: {stress_pct}% ({status})\n"
+        "Hatua: {action}\n"
+        "OpenResilience Kenya"
+    ),
+    ('weekly_summary', 'en'): (
+        "📊 WEEKLY SUMMARY\n"
+        "{county}: Stress {stress_pct}%\n"
+        "Forecast: {forecast}\n"
+        "Tip: {tip}\n"
+        "OpenResilience"
+    ),
+    ('weekly_summary', 'sw'): (
+        "📊 RIPOTI YA WIKI\n"
+        "{county}: Shinikizo {stress_pct}%\n"
+        "Ubashiri: {forecast}\n"
+        "Ushauri: {tip}\n"
+        "OpenResilience"
+    ),
+}
+
+
+@dataclass(frozen=True)
+class RenderedSMS:
+    """A rendered message with its encoding and billing cost."""
+    text: str
+    encoding: str  # 'GSM-7' or 'UCS-2'
+    units: int  # septets (GSM-7) or UTF-16 code units (UCS-2)
+    segments: int
+
+
+def stress_level(stress: float) -> str:
+    """
+    Map a water stress value (0-1) to its alert level.
+
+    Args:
+        stress: Water stress (0-1)
+
+    Returns:
+        'critical', 'high' or 'moderate'
+    """
+    for threshold, level in STRESS_LEVELS:
+        if stress >= threshold:
+            return level
+    return STRESS_LEVELS[-1][1]
+
+
+def analyze(text: str) -> RenderedSMS:
+    """
+    Determine the encoding and segment count of an SMS text.
+
+    Args:
+        text: Message text
+
+    Returns:
+        RenderedSMS for the text
+    """
+    septets = 0
+    for ch in text:
+        if ch in GSM7_BASIC:
+            septets += 1
+        elif ch in GSM7_EXTENDED:
+            septets += 2
+        else:
+            encoding = 'UCS-2'
+            units = len(text.encode('utf-16-le')) // 2
+            break
+    else:
+        encoding = 'GSM-7'
+        units = septets
+
+    single, part = SEGMENT_LIMITS[encoding]
+    segments = 1 if units <= single else math.ceil(units / part)
+    return RenderedSMS(text, encoding, units, segments)
+
+
+class TemplateRegistry:
+    """
+    Compiled templates plus a bounded cache of rendered messages.
+
+    Each (template, language, fields) combination is formatted and analyzed
+    once; later renders of the same message are a dictionary lookup. The
+    least recently used message is dropped once the cache is full.
+    """
+
+    def __init__(self, templates: dict[tuple[str, str], str] = TEMPLATES,
+                 cache_size: int = RENDER_CACHE_SIZE):
+        """
+        Compile templates.
+
+        Args:
+            templates: Format strings keyed by (template, language)
+            cache_size: Most rendered messages to keep
+        """
+        self.compiled = {key: text.format for key, text in templates.items()}
+        self.cache_size = cache_size
+        self.cache: OrderedDict[tuple, RenderedSMS] = OrderedDict()
+
+    def render(self, template: str, language: str = 'en', **fields) -> RenderedSMS:
+        """
+        Render a message, reusing an earlier render of the same message.
+
+        A `level` field ('critical', 'high', 'moderate') fills the template's
+        {emoji} and {status} in the chosen language. Unknown languages fall
+        back to English.
+
+        Args:
+            template: Template name, e.g. 'weekly_summary'
+            language: 'en' or 'sw'
+            **fields: Template values
+
+        Returns:
+            RenderedSMS
+        """
+        if (template, language) not in self.compiled:
+            language = 'en'
+        key = (template, language, tuple(sorted(fields.items())))
+        rendered = self.cache.get(key)
+        if rendered is not None:
+            self.cache.move_to_end(key)
+            return rendered
+        values = dict(fields)
+        if 'level' in values:
+            values['emoji'], values['status'] = LEVEL_LABELS[language][values['level']]
+        rendered = analyze(self.compiled[(template, language)](**values))
+        self.cache[key] = rendered
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return rendered
+
+
+# Shared registry used by SMSAlertService
+registry = TemplateRegistry()
+
+
+class Campaign:
+    """
+    Recipients of one send, grouped by rendered message.
+
+    Add recipients in groups that share a message (e.g. all Kiswahili
+    subscribers of one county); the message is rendered once per group and
+    the segment total is known before anything is sent.
+
+    Example:
+        campaign = Campaign()
+        campaign.add_group(phones, 'weekly_summary', 'sw', county='Kitui',
+                           stress_pct=53, forecast='Mbaya', tip='Vuna maji')
+        print(campaign.summary())
+        sms.send_bulk(campaign.recipients())
+    """
+
+    def __init__(self, templates: TemplateRegistry = None):
+        """
+        Start an empty campaign.
+
+        Args:
+            templates: Registry to render with (defaults to the shared one)
+        """
+        self.templates = templates or registry
+        self.groups: dict[RenderedSMS, list[str]] = {}
+
+    def add_group(self, phones: Iterable[str], template: str, language: str = 'en', **fields) -> RenderedSMS:
+        """
+        Add recipients that all receive the same message.
+
+        Args:
+            phones: Phone numbers
+            template: Template name
+            language: 'en' or 'sw'
+            **fields: Template values
+
+        Returns:
+            The rendered message
+        """
+        rendered = self.templates.render(template, language, **fields)
+        self.groups.setdefault(rendered, []).extend(phones)
+        return rendered
+
+    def add(self, phone: str, template: str, language: str = 'en', **fields) -> RenderedSMS:
+        """
+        Add a single recipient.
+
+        Args:
+            phone: Phone number
+            template: Template name
+            language: 'en' or 'sw'
+            **fields: Template values
+
+        Returns:
+            The rendered message
+        """
+        return self.add_group((phone,), template, language, **fields)
+
+    @property
+    def message_count(self) -> int:
+        """Number of SMS to send (one per recipient)."""
+        return sum(len(phones) for phones in self.groups.values())
+
+    @property
+    def segment_count(self) -> int:
+        """Billed SMS segments for the whole campaign."""
+        return sum(rendered.segments * len(phones) for rendered, phones in self.groups.items())
+
+    def recipients(self) -> Iterator[tuple[str, str]]:
+        """
+        (phone, text) pairs, ready for SMSAlertService.send_bulk.
+
+        Returns:
+            Iterator of (phone, text)
+        """
+        for rendered, phones in self.groups.items():
+            for phone in phones:
+                yield phone, rendered.text
+
+    def summary(self) -> dict[str, int]:
+        """
+        Campaign size before sending.
+
+        Returns:
+            Dict with messages, distinct texts, segments and UCS-2 messages
+        """
+        return {
+            'messages': self.message_count,
+            'distinct_texts': len(self.groups),
+            'segments': self.segment_count,
+            'ucs2_messages': sum(
+                len(phones) for rendered, phones in self.groups.items()
+                if rendered.encoding == 'UCS-2'
+            ),
+        }
+
+
+__all__ = [
+    'RenderedSMS',
+    'TemplateRegistry',
+    'Campaign',
+    'registry',
+    'analyze',
+    'stress_level',
+    'TEMPLATES',
+]
@@ -0,0 +1,217 @@
+"""
+STATUS Reply Cache for OpenResilience SMS
+
+Answers "STATUS <county>" (English) and "HALI <county>" (Kiswahili) from
+replies rendered once per scoring run, so an inbound query is a dictionary
+lookup instead of a score computation or database query.
+
+County names arrive in many spellings ("Taita-Taveta", "taita taveta",
+"Muranga", "Nairobi City"); they resolve through a prebuilt index of
+normalized names and aliases, with a fuzzy fallback for typos.
+"""
+
+import difflib
+import threading
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+from typing import Any, Optional
+
+from .database import DEFAULT_DB_PATH, get_latest_county_scores, get_latest_run_id
+from .sms_templates import TemplateRegistry, registry, stress_level
+
+# Extra spellings and common short forms, by official county name
+COUNTY_ALIASES = {
+    "Elgeyo Marakwet": ["Keiyo Marakwet", "Elgeyo", "Marakwet"],
+    "Homa Bay": ["Homabay"],
+    "Murang'a": ["Muranga", "Muranga'a"],
+    "Nairobi": ["Nairobi City"],
+    "Taita Taveta": ["Taita", "Taveta"],
+    "Tharaka Nithi": ["Tharaka", "Nithi"],
+    "Trans Nzoia": ["Transnzoia", "Kitale"],
+    "Uasin Gishu": ["Eldoret"],
+    "West Pokot": ["Pokot"],
+}
+
+# Closest-match cutoff for misspelled names (difflib ratio, 0-1)
+FUZZY_CUTOFF = 0.8
+
+# Short advice per stress level, per language
+STATUS_ACTIONS = {
+    'en': {
+        'critical': "Ration water, seek relief",
+        'high': "Reduce water use 20%",
+        'moderate': "Harvest rainwater",
+    },
+    'sw': {
+        'critical': "Gawa maji, omba msaada",
+        'high': "Punguza maji 20%",
+        'moderate': "Vuna maji ya mvua",
+    },
+}
+
+# Replies when no county matches
+UNKNOWN_COUNTY = {
+    'en': "County not found.\nExample: STATUS KITUI\nOpenResilience Kenya",
+    'sw': "Kaunti haipatikani.\nMfano: HALI KITUI\nOpenResilience Kenya",
+}
+
+
+def normalize_county(name: str) -> str:
+    """
+    Reduce a county name to lowercase letters and digits.
+
+    "Taita-Taveta", "TAITA TAVETA" and "taita taveta" all become
+    "taitataveta"; "Murang'a" becomes "muranga".
+
+    Args:
+        name: County name as typed
+
+    Returns:
+        Normalized key
+    """
+    return ''.join(ch for ch in name.casefold() if ch.isalnum())
+
+
+class CountyIndex:
+    """
+    Resolves free-text county names to official names.
+
+    Exact matches on normalized names and aliases are one dictionary lookup.
+    Anything else gets a fuzzy match, remembered so a repeated typo costs a
+    lookup too.
+    """
+
+    def __init__(self, counties: Iterable[str], aliases: Mapping[str, Iterable[str]] = COUNTY_ALIASES):
+        """
+        Build the index.
+
+        Args:
+            counties: Official county names
+            aliases: Extra spellings per official name (unknown names ignored)
+        """
+        self.keys: dict[str, str] = {}
+        for county in counties:
+            self.keys[normalize_county(county)] = county
+            for alias in aliases.get(county, ()):
+                self.keys.setdefault(normalize_county(alias), county)
+        self.fuzzy: dict[str, Optional[str]] = {}
+
+    def match(self, text: str) -> Optional[str]:
+        """
+        Find the county a name refers to.
+
+        Args:
+            text: County name as typed
+
+        Returns:
+            Official county name, or None if nothing is close enough
+        """
+        key = normalize_county(text)
+        if not key:
+            return None
+        county = self.keys.get(key)
+        if county is not None:
+            return county
+        if key in self.fuzzy:
+            return self.fuzzy[key]
+        close = difflib.get_close_matches(key, self.keys, n=1, cutoff=FUZZY_CUTOFF)
+        county = self.keys[close[0]] if close else None
+        if len(self.fuzzy) < 10000:  # bounded: inbound text is untrusted
+            self.fuzzy[key] = county
+        return county
+
+
+class StatusReplyCache:
+    """
+    Per-county STATUS replies in English and Kiswahili.
+
+    Rebuilt once per scoring run; readers (e.g. webhook worker threads) see
+    either the old or the new set of replies, never a mix, because a rebuild
+    swaps in a fully built state in one assignment.
+    """
+
+    def __init__(self, templates: TemplateRegistry = None):
+        """
+        Start with no replies; call rebuild() or refresh().
+
+        Args:
+            templates: Registry to render with (defaults to the shared one)
+        """
+        self.templates = templates or registry
+        self.state = (CountyIndex(()), {})  # (index, {(county, language): text})
+        self.run_id: Optional[int] = None
+        self.built_at: Optional[str] = None
+        self.lock = threading.Lock()
+
+    def rebuild(self, scores: Mapping[str, Mapping[str, Any]], run_id: Optional[int] = None) -> int:
+        """
+        Render every county's reply in both languages.
+
+        Args:
+            scores: County name -> scores with 'wsi' on the 0-100 scale
+                (ResilienceScores.to_dict() or a stored run)
+            run_id: Run the scores came from, for refresh()
+
+        Returns:
+            Number of counties cached
+        """
+        replies = {}
+        for county, county_scores in scores.items():
+            level = stress_level(county_scores['wsi'] / 100)
+            for language, actions in STATUS_ACTIONS.items():
+                replies[(county, language)] = self.templates.render(
+                    'status_reply', language,
+                    county_upper=county.upper(), stress_pct=int(county_scores['wsi']),
+                    level=level, action=actions[level]
+                ).text
+        self.state = (CountyIndex(scores), replies)
+        self.run_id = run_id
+        self.built_at = datetime.now().isoformat()
+        return len(scores)
+
+    def refresh(self, db_path: str = DEFAULT_DB_PATH) -> bool:
+        """
+        Rebuild from the database if a scoring run happened since the last build.
+
+        Args:
+            db_path: Database file path
+
+        Returns:
+            True if the cache was rebuilt
+        """
+        with self.lock:
+            run_id = get_latest_run_id(db_path)
+            if run_id is None or run_id == self.run_id:
+                return False
+            self.rebuild(get_latest_county_scores(db_path), run_id)
+            return True
+
+    def reply(self, county_text: Optional[str], language: str = 'en') -> Optional[str]:
+        """
+        Look up the reply for a STATUS query.
+
+        Args:
+            county_text: County name as typed (may be None)
+            language: 'en' or 'sw'
+
+        Returns:
+            Reply text; a "county not found" hint if the name matches
+            nothing; None if the cache has not been built yet
+        """
+        index, replies = self.state
+        if not replies:
+            return None
+        if language not in UNKNOWN_COUNTY:
+            language = 'en'
+        county = index.match(county_text) if county_text else None
+        if county is None:
+            return UNKNOWN_COUNTY[language]
+        return replies[(county, language)]
+
+
+__all__ = [
+    'StatusReplyCache',
+    'CountyIndex',
+    'normalize_county',
+    'COUNTY_ALIASES',
+]
@@ -5,6 +5,9 @@ Tests for multi-index scoring module.
 import sys
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
@@ -14,6 +17,8 @@ from openresilience.scoring import (
     compute_food_stress,
     compute_market_stress,
     compute_composite_risk,
+    compute_resilience_scores_batch,
+    score_dataframe,
     ResilienceScores
 )
 
@@ -135,3 +140,52 @@ def test_extreme_values_clamped():
     assert 0 <= scores.fsi <= 100
     assert 0 <= scores.msi <= 100
     assert 0 <= scores.cri <= 100
+
+
+def random_signals(n, seed=7):
+    """Signals spanning and exceeding the documented ranges, with edge values."""
+    rng = np.random.default_rng(seed)
+    signals = pd.DataFrame({
+        "rainfall_anomaly": rng.uniform(-150, 150, n),
+        "soil_moisture": rng.uniform(-0.5, 1.5, n),
+        "vegetation_health": rng.uniform(-0.5, 1.5, n),
+        "staple_price_change": rng.uniform(-150, 150, n),
+        "market_stockouts": rng.integers(0, 8, n),
+        "field_reports_24h": rng.integers(0, 12, n),
+    })
+    # Exact thresholds, where a comparison could flip
+    signals.loc[:9, "rainfall_anomaly"] = [-20, -20.0000001, -100, 100, 0, -0.0, 20, -19.9999, -200, 0.5]
+    signals.loc[:9, "soil_moisture"] = [0.35, 0.3499999, 0, 1, 0.5, 2.0, -1.0, 0.35, 0.0, 1.0]
+    signals.loc[:9, "vegetation_health"] = [0.45, 0.4499999, 0, 1, 0.7, 0.45, 2.0, -1.0, 1.0, 0.0]
+    signals.loc[:9, "field_reports_24h"] = [2, 1, 0, 1000, 9, 8, 2, 3, 0, 1]
+    return signals
+
+
+def test_batch_matches_scalar_exactly():
+    """Test the vectorized scores equal the scalar ones bit for bit."""
+    signals = random_signals(2000)
+    batch = compute_resilience_scores_batch(**{name: signals[name].to_numpy() for name in signals})
+
+    for i, row in enumerate(signals.to_dict("records")):
+        row["market_stockouts"] = int(row["market_stockouts"])
+        row["field_reports_24h"] = int(row["field_reports_24h"])
+        expected = compute_resilience_scores(**row).to_dict()
+        for name, value in expected.items():
+            assert batch[name][i] == value, (name, row, batch[name][i], value)
+
+
+def test_batch_broadcasts_scalars():
+    """Test scalar arguments broadcast against arrays."""
+    batch = compute_resilience_scores_batch(rainfall_anomaly=np.array([-45.0, 0.0]), market_stockouts=2)
+    assert batch["msi"].shape == (2,)
+    assert batch["wsi"][0] == compute_resilience_scores(rainfall_anomaly=-45.0, market_stockouts=2).wsi
+
+
+def test_score_dataframe_defaults_and_index():
+    """Test missing columns use the scalar defaults and the index is kept."""
+    signals = pd.DataFrame({"rainfall_anomaly": [-30.0, 10.0]}, index=["Kitui", "Nyeri"])
+    scores = score_dataframe(signals)
+
+    assert list(scores.index) == ["Kitui", "Nyeri"]
+    assert list(scores.columns) == ["wsi", "fsi", "msi", "cri", "confidence"]
+    assert scores.loc["Nyeri"].to_dict() == compute_resilience_scores(rainfall_anomaly=10.0).to_dict()
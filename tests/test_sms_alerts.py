@@ -0,0 +1,144 @@
+"""
+Tests for SMS alert service.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from openresilience.database import get_connection
+from openresilience.sms_alerts import SMSAlertService, SubscriptionManager
+
+
+class FakeSMS:
+    """Records bulk calls and accepts every recipient except `reject`."""
+
+    def __init__(self, reject=()):
+        self.calls = []
+        self.reject = set(reject)
+
+    def send(self, message, recipients):
+        self.calls.append((message, list(recipients)))
+        return {'SMSMessageData': {'Recipients': [
+            {'number': r, 'status': 'InvalidPhoneNumber' if r in self.reject else 'Success'}
+            for r in recipients
+        ]}}
+
+
+def make_service(sms):
+    service = SMSAlertService.__new__(SMSAlertService)
+    service.sms = sms
+    service.available = True
+    return service
+
+
+def test_send_bulk_groups_identical_messages():
+    """Test one call per distinct message, with numbers normalized."""
+    sms = FakeSMS()
+    service = make_service(sms)
+
+    result = service.send_bulk([
+        ("0712000001", "Kitui: HIGH"),
+        ("254712000002", "Kitui: HIGH"),
+        ("0712000003", "Kitui: JUU"),
+        ("+254712000001", "Kitui: HIGH"),  # duplicate of the first
+    ])
+
+    assert result['success']
+    assert result['sent'] == 3
+    assert result['api_calls'] == 2
+    assert sms.calls == [
+        ("Kitui: HIGH", ["+254712000001", "+254712000002"]),
+        ("Kitui: JUU", ["+254712000003"]),
+    ]
+
+
+def test_send_bulk_chunks_recipients():
+    """Test large groups are split at the chunk size."""
+    sms = FakeSMS()
+    service = make_service(sms)
+
+    recipients = [(f"07{i:08d}", "Turkana: CRITICAL") for i in range(2500)]
+    result = service.send_bulk(recipients, chunk_size=1000)
+
+    assert result['sent'] == 2500
+    assert result['api_calls'] == 3
+    assert [len(call[1]) for call in sms.calls] == [1000, 1000, 500]
+
+
+def test_send_bulk_reports_rejected_recipients():
+    """Test per-recipient gateway failures are counted, not the whole batch."""
+    sms = FakeSMS(reject={"+254712000002"})
+    service = make_service(sms)
+
+    result = service.send_bulk([("0712000001", "msg"), ("0712000002", "msg")])
+
+    assert not result['success']
+    assert result['sent'] == 1
+    assert result['failures'] == [{'phone': "+254712000002", 'error': 'InvalidPhoneNumber'}]
+
+
+def test_send_bulk_unavailable():
+    """Test nothing is sent when the SDK is missing."""
+    service = make_service(None)
+    service.available = False
+
+    result = service.send_bulk([("0712000001", "msg")])
+
+    assert not result['success']
+    assert result['failed'] == 1
+    assert result['api_calls'] == 0
+
+
+def test_subscriptions_persist_across_managers():
+    """Test subscriptions survive a restart (a new manager on the same file)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "subs.db")
+
+        manager = SubscriptionManager(db_path)
+        manager.subscribe("+254712000001", "Kitui", "sw")
+        manager.subscribe("+254712000002", "Kitui", "en")
+        manager.subscribe("+254712000003", "Turkana", "en")
+        assert manager.unsubscribe("+254712000002")
+        assert not manager.unsubscribe("+254799999999")
+
+        restarted = SubscriptionManager(db_path)
+        kitui = restarted.get_subscribers_for_county("Kitui")
+        assert [s['phone'] for s in kitui] == ["+254712000001"]
+        assert kitui[0]['language'] == "sw"
+        assert kitui[0]['active'] is True
+        assert len(restarted.get_all_active_subscribers()) == 2
+
+
+def test_resubscribe_moves_county():
+    """Test subscribing again reactivates and updates the same phone."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "subs.db")
+
+        manager = SubscriptionManager(db_path)
+        manager.subscribe("+254712000001", "Kitui")
+        manager.unsubscribe("+254712000001")
+        manager.subscribe("+254712000001", "Makueni", "sw")
+
+        assert manager.get_subscribers_for_county("Kitui") == []
+        makueni = manager.get_subscribers_for_county("Makueni")
+        assert [(s['phone'], s['language']) for s in makueni] == [("+254712000001", "sw")]
+
+
+def test_county_lookup_uses_index():
+    """Test county fan-out is an index search, not a table scan."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "subs.db")
+        SubscriptionManager(db_path)
+
+        with get_connection(db_path) as conn:
+            plan = " ".join(
+                row['detail'] for row in conn.execute(
+                    "EXPLAIN QUERY PLAN SELECT * FROM sms_subscriptions "
+                    "WHERE active = 1 AND county = ? ORDER BY county, language", ("Kitui",)
+                )
+            )
+        assert "idx_sms_subs_county" in plan
@@ -0,0 +1,94 @@
+"""
+Tests for SMS message templates.
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from openresilience.sms_templates import Campaign, TemplateRegistry, analyze, stress_level
+
+
+def test_gsm7_segments():
+    """Test plain ASCII text is GSM-7 with 160/153 septet segments."""
+    assert analyze("a" * 160).encoding == 'GSM-7'
+    assert analyze("a" * 160).segments == 1
+    assert analyze("a" * 161).segments == 2
+    assert analyze("a" * 306).segments == 2
+    assert analyze("a" * 307).segments == 3
+
+
+def test_gsm7_extension_characters_cost_two_septets():
+    """Test extension characters such as the euro sign count double."""
+    result = analyze("€" * 80)
+    assert result.encoding == 'GSM-7'
+    assert result.units == 160
+    assert result.segments == 1
+    assert analyze("€" * 81).segments == 2
+
+
+def test_emoji_forces_ucs2():
+    """Test one emoji switches the whole message to UCS-2."""
+    result = analyze("🔴" + "a" * 68)
+    assert result.encoding == 'UCS-2'
+    assert result.units == 70  # the emoji is a surrogate pair
+    assert result.segments == 1
+    assert analyze("🔴" + "a" * 69).segments == 2
+
+
+def test_stress_levels():
+    """Test stress thresholds match the alert levels."""
+    assert stress_level(0.95) == 'critical'
+    assert stress_level(0.7) == 'critical'
+    assert stress_level(0.69) == 'high'
+    assert stress_level(0.5) == 'high'
+    assert stress_level(0.1) == 'moderate'
+
+
+def test_render_is_cached_and_bilingual():
+    """Test each distinct message is rendered once, per language."""
+    registry = TemplateRegistry()
+    en = registry.render('water_stress', 'en', county='Kitui', level='critical', action='Save water')
+    sw = registry.render('water_stress', 'sw', county='Kitui', level='critical', action='Okoa maji')
+
+    assert en.text.startswith("🔴 OPENRESILIENCE\nKitui: CRITICAL")
+    assert "Kitui: DHARURA" in sw.text
+    assert registry.render('water_stress', 'en', county='Kitui', level='critical', action='Save water') is en
+    assert len(registry.cache) == 2
+
+
+def test_render_cache_is_bounded():
+    """Test the least recently used message is evicted once the cache is full."""
+    registry = TemplateRegistry(cache_size=2)
+    kitui = registry.render('water_truck', 'en', location='Kitui', time='9am', cost='KES 20')
+    registry.render('water_truck', 'en', location='Mwingi', time='9am', cost='KES 20')
+    assert registry.render('water_truck', 'en', location='Kitui', time='9am', cost='KES 20') is kitui
+
+    registry.render('water_truck', 'en', location='Mutomo', time='9am', cost='KES 20')
+    assert len(registry.cache) == 2
+    assert registry.render('water_truck', 'en', location='Kitui', time='9am', cost='KES 20') is kitui
+    assert {dict(key[2])['location'] for key in registry.cache} == {'Kitui', 'Mutomo'}
+
+
+def test_unknown_language_falls_back_to_english():
+    """Test unsupported languages get the English text."""
+    registry = TemplateRegistry()
+    fields = dict(location='Mwingi', time='10am', cost='KES 20')
+    assert registry.render('water_truck', 'fr', **fields) is registry.render('water_truck', 'en', **fields)
+
+
+def test_campaign_summary():
+    """Test campaign totals are known before sending."""
+    campaign = Campaign(TemplateRegistry())
+    fields = dict(county='Kitui', stress_pct=53, forecast='Worsening', tip='Harvest rainwater')
+    text = campaign.add_group([f"+2547{i:08d}" for i in range(1000)], 'weekly_summary', 'en', **fields)
+    campaign.add("+254799999999", 'weekly_summary', 'en', **fields)
+
+    summary = campaign.summary()
+    assert summary['messages'] == 1001
+    assert summary['distinct_texts'] == 1
+    assert summary['segments'] == 1001 * text.segments
+    assert summary['ucs2_messages'] == 1001
+    assert len(list(campaign.recipients())) == 1001
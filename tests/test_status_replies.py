@@ -0,0 +1,123 @@
+"""
+Tests for the STATUS reply cache.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import pandas as pd
+
+from openresilience.database import ensure_region, init_database, insert_county_runs, insert_run
+from openresilience.scoring import score_dataframe
+from openresilience.sms_alerts import SMSAlertService
+from openresilience.status_replies import CountyIndex, StatusReplyCache, normalize_county
+
+COUNTIES = ["Taita Taveta", "Murang'a", "Kitui", "Nairobi", "West Pokot"]
+
+
+def scores(wsi):
+    return {"wsi": wsi, "fsi": 40.0, "msi": 30.0, "cri": 45.0, "confidence": 70.0}
+
+
+def test_normalize_county():
+    """Test spelling variants share one key."""
+    assert normalize_county("Taita-Taveta") == normalize_county("TAITA TAVETA") == "taitataveta"
+    assert normalize_county("Murang'a") == "muranga"
+
+
+def test_county_index_aliases_and_typos():
+    """Test exact, alias and misspelled names resolve; nonsense does not."""
+    index = CountyIndex(COUNTIES)
+    assert index.match("taita-taveta") == "Taita Taveta"
+    assert index.match("Taveta") == "Taita Taveta"
+    assert index.match("MURANGA") == "Murang'a"
+    assert index.match("Nairobi City") == "Nairobi"
+    assert index.match("Kituii") == "Kitui"
+    assert index.match("Mombasa") is None
+    assert index.match("!!") is None
+
+
+def test_replies_in_both_languages():
+    """Test every county gets an English and a Kiswahili reply."""
+    cache = StatusReplyCache()
+    assert cache.reply("Kitui") is None  # not built yet
+
+    cache.rebuild({"Kitui": scores(75.0), "Nairobi": scores(20.0)})
+
+    assert cache.reply("kitui") == (
+        "🔴 KITUI\nWater Stress: 75% (CRITICAL)\nAction: Ration water, seek relief\nOpenResilience Kenya"
+    )
+    assert "Shinikizo la Maji: 75% (DHARURA)" in cache.reply("KITUI", 'sw')
+    assert "(MODERATE)" in cache.reply("Nairobi City")
+    assert cache.reply("Atlantis").startswith("County not found")
+    assert cache.reply(None, 'sw').startswith("Kaunti haipatikani")
+
+
+def test_reply_percentage_is_exact():
+    """Test the WSI percentage is not shifted by float round-off."""
+    cache = StatusReplyCache()
+    cache.rebuild({"Kitui": scores(57.0), "Nairobi": scores(29.0)})
+
+    assert "Water Stress: 57% (HIGH)" in cache.reply("Kitui")
+    assert "Water Stress: 29% (MODERATE)" in cache.reply("Nairobi")
+
+
+def test_refresh_rebuilds_once_per_run():
+    """Test the cache follows the latest stored run and skips unchanged runs."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "runs.db")
+        init_database(db_path)
+        cache = StatusReplyCache()
+        assert not cache.refresh(db_path)  # no runs yet
+
+        kitui = ensure_region("Kitui", db_path=db_path)
+        insert_run(kitui, scores(55.0), {}, timestamp="2026-01-01T00:00:00", db_path=db_path)
+        assert cache.refresh(db_path)
+        assert "55% (HIGH)" in cache.reply("Kitui")
+        assert not cache.refresh(db_path)
+
+        insert_run(kitui, scores(80.0), {}, timestamp="2026-01-08T00:00:00", db_path=db_path)
+        assert cache.refresh(db_path)
+        assert "80% (CRITICAL)" in cache.reply("Kitui")
+
+
+def test_refresh_follows_scoring_pass():
+    """Test a recorded score_dataframe pass is what the cache serves."""
+    signals = pd.DataFrame({
+        "rainfall_anomaly": [-50.0, 5.0],
+        "soil_moisture": [0.2, 0.7],
+        "vegetation_health": [0.3, 0.8],
+    })
+    passed = pd.concat([pd.DataFrame({"county": ["Kitui", "Nairobi"]}), score_dataframe(signals)], axis=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "runs.db")
+        init_database(db_path)
+        assert insert_county_runs(passed.to_dict("records"), db_path=db_path) == 2
+
+        cache = StatusReplyCache()
+        assert cache.refresh(db_path)
+        for county, wsi in zip(passed["county"], passed["wsi"]):
+            assert f"Water Stress: {int(wsi)}%" in cache.reply(county)
+
+        insert_county_runs(passed.to_dict("records"), db_path=db_path)
+        assert cache.refresh(db_path)  # every pass is a new run
+
+
+def test_parse_incoming_status_uses_cache():
+    """Test STATUS/HALI replies come from the cache, with multi-word counties."""
+    service = SMSAlertService.__new__(SMSAlertService)
+    service.status_replies = StatusReplyCache()
+    service.status_replies.rebuild({"Taita Taveta": scores(60.0)})
+
+    result = service.parse_incoming_sms("0712000001", "status taita taveta")
+    assert result['command'] == 'status_request'
+    assert result['county'] == "TAITA TAVETA"
+    assert result['response'].startswith("🟠 TAITA TAVETA\nWater Stress: 60% (HIGH)")
+
+    result = service.parse_incoming_sms("0712000001", "HALI Taita-Taveta")
+    assert result['language'] == 'sw'
+    assert "(HATARI)" in result['response']
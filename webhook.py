@@ -2,11 +2,27 @@
 Webhook to handle incoming SMS from Africa's Talking
 
 Deploy this to receive SMS from farmers and auto-respond.
+
+The callback parses the command, records SUBSCRIBE/STOP in the database and
+queues the reply, then returns; replies are sent by a pool of background
+workers. A burst of inbound SMS (e.g. a radio announcement asking a county
+to text MAJI) therefore never holds the gateway's callback open on our
+outbound HTTP requests, and a subscription change is stored before the
+gateway is told the message was handled.
+
+Environment:
+    SMS_WORKERS     reply worker threads per serving process (default 8)
+    SMS_QUEUE_SIZE  queued commands before callbacks get 503 (default 10000)
+    STATUS_REFRESH_SEC  how often to check for a new scoring run (default 60)
 """
 
 from flask import Flask, request, jsonify
+import logging
+import queue
 import sys
 import os
+import threading
+import time
 
 # Load environment variables
 try:
@@ -18,90 +34,154 @@ except ImportError:
 sys.path.insert(0, 'src')
 
 from openresilience.sms_alerts import SMSAlertService, SubscriptionManager
+from openresilience.status_replies import StatusReplyCache
 
 app = Flask(__name__)
 
+log = logging.getLogger("openresilience.webhook")
+
 # Initialize services
 sms_service = SMSAlertService()
 sub_manager = SubscriptionManager()
+sms_service.status_replies = StatusReplyCache()
 
+# Parsed commands waiting for a reply worker
+inbox = queue.Queue(maxsize=int(os.getenv('SMS_QUEUE_SIZE', '10000')))
 
-@app.route('/sms/callback', methods=['POST'])
-def handle_incoming_sms():
+
+def record_subscription(result):
     """
-    Handle incoming SMS from Africa's Talking.
+    Store a SUBSCRIBE or STOP before the callback is acknowledged.
     
-    Called when someone sends SMS to your shortcode/number.
+    Both writes are idempotent, so a gateway retry after a failed callback
+    (or a 503) is safe.
     """
-    
-    # Get SMS details from Africa's Talking
-    from_number = request.values.get('from', '')
-    to_number = request.values.get('to', '')
-    text = request.values.get('text', '')
-    date = request.values.get('date', '')
-    id = request.values.get('id', '')
-    
-    print(f"\n📱 Incoming SMS:")
-    print(f"  From: {from_number}")
-    print(f"  To: {to_number}")
-    print(f"  Text: {text}")
-    print(f"  Date: {date}")
-    print(f"  ID: {id}")
-    
-    # Parse command
-    result = sms_service.parse_incoming_sms(from_number, text)
-    
-    print(f"\n🔍 Parsed command: {result['command']}")
-    
-    # Handle different commands
     if result['command'] == 'subscribe':
         # Subscribe user
         # TODO: Get county from user (for now, default to Kiambu)
         sub_manager.subscribe(result['phone'], 'Kiambu', 'en')
-        
-        print(f"✅ Subscribed: {result['phone']}")
-        
-        # Send confirmation
-        if result['response']:
-            sms_service.send_alert(result['phone'], result['response'])
     
     elif result['command'] == 'unsubscribe':
         # Unsubscribe user
         sub_manager.unsubscribe(result['phone'])
-        
-        print(f"✅ Unsubscribed: {result['phone']}")
-        
-        # Send confirmation
-        if result['response']:
-            sms_service.send_alert(result['phone'], result['response'])
-    
-    elif result['command'] == 'help':
-        # Send help message
-        if result['response']:
-            sms_service.send_alert(result['phone'], result['response'])
+
+
+def process_command(result):
+    """
+    Send the reply to a parsed command.
     
-    elif result['command'] == 'status_request':
-        # Get current status for county
-        county = result.get('county', 'Kiambu')
+    Runs on a worker thread, off the gateway's callback.
+    """
+    if result['command'] == 'status_request' and result['response'] is None:
+        # No scoring run recorded yet, so the reply cache is empty
+        county = result.get('county') or 'Kiambu'
         
         # TODO: Get real data from database
         # For now, send sample
-        sample_response = (
+        result['response'] = (
             f"📊 {county.upper()}\n"
             f"Water Stress: 53% (HIGH)\n"
             f"Action: Reduce water 20%\n"
             f"OpenResilience Kenya"
         )
-        
-        sms_service.send_alert(result['phone'], sample_response)
     
-    else:
-        # Unknown command
-        if result['response']:
-            sms_service.send_alert(result['phone'], result['response'])
+    # Send confirmation / help / status / unknown-command reply
+    if result['response']:
+        sent = sms_service.send_alert(result['phone'], result['response'])
+        if not sent.get('success'):
+            log.warning("reply failed command=%s error=%s", result['command'], sent.get('error'))
+
+
+def reply_worker():
+    """Process queued commands until the process exits."""
+    while True:
+        result = inbox.get()
+        try:
+            process_command(result)
+        except Exception:
+            log.exception("command failed command=%s", result.get('command'))
+        finally:
+            inbox.task_done()
+
+
+def start_workers(count):
+    """Start the reply worker pool (daemon threads)."""
+    for i in range(count):
+        threading.Thread(target=reply_worker, name=f"sms-reply-{i}", daemon=True).start()
+
+
+def refresh_status_replies(interval):
+    """Rebuild the STATUS reply cache whenever a new scoring run is recorded."""
+    while True:
+        try:
+            if sms_service.status_replies.refresh():
+                log.info("status replies rebuilt run_id=%s", sms_service.status_replies.run_id)
+        except Exception:
+            log.exception("status reply refresh failed")
+        time.sleep(interval)
+
+
+background_started = False
+background_lock = threading.Lock()
+
+
+def start_background():
+    """
+    Start the reply workers and the STATUS refresher, once per process.
+
+    Not done at import: the debug reloader's parent process imports this
+    module but never serves, and a WSGI server that imports before forking
+    would leave the threads behind in the master.
+    """
+    global background_started
+    with background_lock:
+        if background_started:
+            return
+        background_started = True
+    start_workers(int(os.getenv('SMS_WORKERS', '8')))
+    threading.Thread(
+        target=refresh_status_replies, args=(int(os.getenv('STATUS_REFRESH_SEC', '60')),),
+        name="status-refresh", daemon=True
+    ).start()
+
+
+@app.before_request
+def ensure_background():
+    """Start the background threads in the process that serves (WSGI entry)."""
+    if not background_started:
+        start_background()
+
+
+@app.route('/sms/callback', methods=['POST'])
+def handle_incoming_sms():
+    """
+    Handle incoming SMS from Africa's Talking.
+    
+    Called when someone sends SMS to your shortcode/number. Parses the
+    command, stores any subscription change and queues the reply, then
+    acknowledges without waiting for the reply.
+    """
+    
+    # Get SMS details from Africa's Talking
+    from_number = request.values.get('from', '')
+    text = request.values.get('text', '')
+    
+    # Parse command
+    result = sms_service.parse_incoming_sms(from_number, text)
+    log.debug("inbound id=%s command=%s", request.values.get('id', ''), result['command'])
+    
+    # A local SQLite write; an error fails the callback so the gateway retries
+    record_subscription(result)
+    
+    try:
+        inbox.put_nowait(result)
+    except queue.Full:
+        # Ask the gateway to retry later rather than dropping the command
+        log.warning("inbox full, rejecting command=%s", result['command'])
+        return jsonify({'status': 'busy'}), 503
     
     # Return success to Africa's Talking
-    return jsonify({'status': 'success'}), 200
+    return jsonify({'status': 'queued'}), 200
 
 
 @app.route('/health', methods=['GET'])
@@ -110,11 +190,14 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'service': 'OpenResilience SMS Webhook',
-        'sms_available': sms_service.available
+        'sms_available': sms_service.available,
+        'queued': inbox.qsize()
     }), 200
 
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    
     print("=" * 60)
     print("OpenResilience SMS Webhook Server")
     print("=" * 60)
@@ -127,4 +210,8 @@ if __name__ == '__main__':
     print("\nThen configure webhook URL in Africa's Talking dashboard")
     print("=" * 60)
     
+    # With debug=True the reloader re-runs this file in a child that serves;
+    # only that child starts the threads
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background()
     app.run(host='0.0.0.0', port=5000, debug=True)
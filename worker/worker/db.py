@@ -5,4 +5,7 @@ def conn():
     s=Settings()
     c=psycopg.connect(s.postgres_url)
     c.autocommit=True
+    # TIMESTAMP columns hold naive UTC; aware datetimes bound as timestamptz
+    # are converted through the session zone, so pin it.
+    c.execute("SET TIME ZONE 'UTC'")
     return c
@@ -0,0 +1,65 @@
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+
+class Grid(NamedTuple):
+    """Cell geometry for an (h, w) grid, flattened row-major to match ndarray.ravel()."""
+    signature: str
+    shape: tuple
+    step: float
+    region_ids: np.ndarray
+    lat: np.ndarray
+    lon: np.ndarray
+
+def region_id_for_cell(lat_center, lon_center, step):
+    return f"grid_{str(step).replace('.','p')}_lat_{lat_center:.2f}_lon_{lon_center:.2f}"
+
+def cell_center(i, j, shape, step_deg):
+    h, w = shape
+    lat = 90 - (i + 0.5) * (180 / h)
+    lon = -180 + (j + 0.5) * (360 / w)
+    lat_c = (int(lat / step_deg) * step_deg) + step_deg/2
+    lon_c = (int(lon / step_deg) * step_deg) + step_deg/2
+    return lat_c, lon_c
+
+@lru_cache(maxsize=8)
+def grid_geometry(shape, step):
+    """Vectorized cell_center/region_id_for_cell for every cell of the grid.
+
+    Latitude depends only on the row and longitude only on the column, so each
+    axis is snapped and formatted once and the region ids are built by broadcasting.
+    Results are cached per (shape, step); treat the arrays as read-only.
+    """
+    h, w = shape
+    lat = 90 - (np.arange(h) + 0.5) * (180 / h)
+    lon = -180 + (np.arange(w) + 0.5) * (360 / w)
+    lat_c = np.trunc(lat / step) * step + step/2
+    lon_c = np.trunc(lon / step) * step + step/2
+    prefix = f"grid_{str(step).replace('.','p')}_lat_"
+    lat_s = np.char.add(prefix, np.char.mod("%.2f", lat_c))
+    lon_s = np.char.add("_lon_", np.char.mod("%.2f", lon_c))
+    region_ids = np.char.add(lat_s[:, None], lon_s[None, :]).ravel()
+    lat_grid, lon_grid = (a.ravel() for a in np.meshgrid(lat_c, lon_c, indexing="ij"))
+    for a in (region_ids, lat_grid, lon_grid):
+        a.flags.writeable = False
+    return Grid(f"{h}x{w}@{step}", (h, w), step, region_ids, lat_grid, lon_grid)
+
+_registered = set()
+
+def regions_registered(cur, grid):
+    """True when this grid's regions were already upserted by an earlier run."""
+    if grid.signature in _registered:
+        return True
+    cur.execute("SELECT 1 FROM grids WHERE signature=%s", (grid.signature,))
+    return cur.fetchone() is not None
+
+def register_grid(cur, grid, now):
+    h, w = grid.shape
+    cur.execute("INSERT INTO grids(signature, h, w, step_deg, created_utc) VALUES (%s,%s,%s,%s,%s) ON CONFLICT (signature) DO NOTHING",
+                (grid.signature, h, w, grid.step, now))
+
+def mark_registered(grid):
+    """Remember a committed registration so later runs in this process skip the lookup."""
+    _registered.add(grid.signature)
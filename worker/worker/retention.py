@@ -0,0 +1,76 @@
+from datetime import date
+
+from or_shared.timeutils import utcnow
+
+from worker.db import conn
+from worker.settings import Settings
+from worker.writers import restore_latest
+
+# partitioned table -> rollup of one expiring partition, run just before it is dropped
+ROLLUPS = {
+    "indicators_wide": """
+        INSERT INTO indicator_rollups(month, region_id, runs, avg_wsi, avg_fsi, avg_msi, avg_cri, max_cri)
+        SELECT %(month)s, region_id, COUNT(DISTINCT run_id), AVG(wsi), AVG(fsi), AVG(msi), AVG(cri), MAX(cri)
+        FROM {part} GROUP BY region_id
+        ON CONFLICT (month, region_id) DO NOTHING""",
+    "alerts": """
+        INSERT INTO alert_rollups(month, region_id, domain, alerts, max_severity)
+        SELECT %(month)s, region_id, domain, COUNT(*), MAX(severity)
+        FROM {part} GROUP BY region_id, domain
+        ON CONFLICT (month, region_id, domain) DO NOTHING""",
+}
+
+def month_start(d, offset=0):
+    m = d.year * 12 + (d.month - 1) + offset
+    return date(m // 12, m % 12 + 1, 1)
+
+def ensure_partitions(cur, now):
+    """Create this month's and next month's partitions so run inserts never miss one."""
+    for parent in ROLLUPS:
+        for ts in (month_start(now), month_start(now, 1)):
+            cur.execute("SELECT ensure_month_partition(%s, %s)", (parent, ts))
+
+def expired_partitions(cur, parent, cutoff):
+    """(name, month) of partitions of `parent` that end on or before `cutoff`."""
+    cur.execute("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = %s::regclass ORDER BY c.relname", (parent,))
+    out = []
+    for (name,) in cur.fetchall():
+        suffix = name.rsplit("_p", 1)[-1]
+        if len(suffix) != 6 or not suffix.isdigit():
+            continue
+        month = date(int(suffix[:4]), int(suffix[4:]), 1)
+        if month_start(month, 1) <= cutoff:
+            out.append((name, month))
+    return out
+
+def prune(cur, keep_months, now, rollup=True):
+    """Summarize then drop partitions older than `keep_months` full months.
+
+    Also deletes legacy narrow indicator rows and finished outbox messages
+    past the same cutoff.
+    """
+    cutoff = month_start(now, -keep_months)
+    dropped = []
+    for parent, rollup_sql in ROLLUPS.items():
+        for name, month in expired_partitions(cur, parent, cutoff):
+            if rollup:
+                cur.execute(rollup_sql.format(part=f'"{name}"'), {"month": month})
+            cur.execute(f'DROP TABLE "{name}"')
+            dropped.append(name)
+    cur.execute("DELETE FROM indicators WHERE updated_utc < %s", (cutoff,))
+    cur.execute("DELETE FROM outbox WHERE status <> 'pending' AND done_utc < %s", (cutoff,))
+    return dropped
+
+def run_retention():
+    s = Settings()
+    now = utcnow()
+    with conn() as c, c.transaction(), c.cursor() as cur:
+        ensure_partitions(cur, now)
+        dropped = prune(cur, s.retention_months, now, rollup=s.retention_rollup)
+        restored = restore_latest(cur)
+    print(f"OK retention keep_months={s.retention_months} dropped={dropped} restored={restored}")
+    return dropped
+
+if __name__ == "__main__":
+    run_retention()
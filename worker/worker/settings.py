@@ -6,3 +6,6 @@ class Settings(BaseModel):
     version: str = os.environ.get('OR_VERSION','0.3.0')
     grid_step_deg: float = float(os.environ.get('GRID_STEP_DEG','0.25'))
     adapter: str = os.environ.get('DATA_ADAPTER','synthetic')
+    persist_mode: str = os.environ.get('PERSIST_MODE','copy')
+    retention_months: int = int(os.environ.get('RETENTION_MONTHS','6'))
+    retention_rollup: bool = os.environ.get('RETENTION_ROLLUP','1') == '1'
@@ -0,0 +1,117 @@
+from datetime import timezone
+
+import numpy as np
+from psycopg.types.json import Jsonb
+
+METRICS = ("rain_anom", "soil_pct", "ndvi_anom", "persistence_wk", "wsi", "fsi", "msi", "cri")
+SEVERITY_METRICS = ("wsi", "fsi", "msi", "cri")
+ALERT_DOMAIN = "composite"
+ALERT_MESSAGE = "Composite drought/water/food stress signals elevated. Verify locally; prioritize vulnerable groups. Avoid rumor-based movements."
+
+def alert_title(sev):
+    return "Crisis risk elevated" if sev == 2 else "Crisis risk severe"
+
+def alert_cells(values):
+    """Flat (row-major) indices of cells whose composite severity raises an alert."""
+    return np.flatnonzero(values["cri"].ravel() >= 2)
+
+def alert_details(values, k, confidence):
+    cri, wsi, fsi, msi = (values[m].ravel() for m in ("cri", "wsi", "fsi", "msi"))
+    return {"cri": int(cri[k]), "wsi": int(wsi[k]), "fsi": int(fsi[k]), "msi": int(msi[k]), "confidence": confidence}
+
+def upsert_regions_rows(cur, grid):
+    for rid, lat_c, lon_c in zip(grid.region_ids.tolist(), grid.lat.tolist(), grid.lon.tolist()):
+        cur.execute("INSERT INTO regions(region_id, region_name, level, lat, lon, meta) VALUES (%s,%s,%s,%s,%s,%s) ON CONFLICT (region_id) DO NOTHING",
+                    (rid, None, "grid", lat_c, lon_c, "{}"))
+
+def upsert_regions_copy(cur, grid):
+    """COPY regions through a temp table, since COPY cannot express ON CONFLICT."""
+    cur.execute("CREATE TEMP TABLE tmp_regions (region_id TEXT, lat REAL, lon REAL) ON COMMIT DROP")
+    with cur.copy("COPY tmp_regions (region_id, lat, lon) FROM STDIN") as cp:
+        cp.set_types(["text", "float4", "float4"])
+        for row in zip(grid.region_ids.tolist(), grid.lat.tolist(), grid.lon.tolist()):
+            cp.write_row(row)
+    cur.execute("INSERT INTO regions(region_id, region_name, level, lat, lon, meta) "
+                "SELECT region_id, NULL, 'grid', lat, lon, '{}' FROM tmp_regions ON CONFLICT (region_id) DO NOTHING")
+
+def indicator_columns(values):
+    """Per-metric flat lists in METRICS order, severities as ints."""
+    return [values[m].ravel().astype(int if m in SEVERITY_METRICS or m == "persistence_wk" else float).tolist() for m in METRICS]
+
+def write_rows(cur, run_db_id, grid, values, confidence, now, valid_start, valid_end):
+    """Row-at-a-time writer: one INSERT per region row and alert.
+
+    Kept for connection poolers that cannot proxy COPY and as the benchmark baseline.
+    """
+    rids = grid.region_ids.tolist()
+    for rid, *vals in zip(rids, *indicator_columns(values)):
+        cur.execute("INSERT INTO indicators_wide(run_id, region_id, rain_anom, soil_pct, ndvi_anom, persistence_wk, wsi, fsi, msi, cri, updated_utc) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)",
+                    (run_db_id, rid, *vals, now))
+    cri = values["cri"].ravel()
+    for k in alert_cells(values).tolist():
+        sev = int(cri[k])
+        cur.execute("INSERT INTO alerts(run_id, region_id, domain, severity, title, message, details, valid_start_utc, valid_end_utc, created_utc) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)",
+                    (run_db_id, rids[k], ALERT_DOMAIN, sev, alert_title(sev), ALERT_MESSAGE, Jsonb(alert_details(values, k, confidence)), valid_start, valid_end, now))
+
+def write_copy(cur, run_db_id, grid, values, confidence, now, valid_start, valid_end):
+    """Bulk writer: streams indicators and alerts with COPY ... FROM STDIN.
+
+    Must run inside a transaction so a failed run leaves no partial rows behind.
+    """
+    rids = grid.region_ids.tolist()
+    # One indicators_wide row per cell; the COPY text is formatted directly
+    # instead of adapting every value through write_row.
+    # updated_utc is a TIMESTAMP: write naive UTC, as the session (UTC, see
+    # db.conn) stores the bound datetime in write_rows.
+    head = f"{run_db_id}\t"
+    tail = f"\t{now.astimezone(timezone.utc).replace(tzinfo=None).isoformat()}\n"
+    with cur.copy("COPY indicators_wide (run_id, region_id, rain_anom, soil_pct, ndvi_anom, persistence_wk, wsi, fsi, msi, cri, updated_utc) FROM STDIN") as cp:
+        cp.write("".join(f"{head}{rid}\t{a!r}\t{sp!r}\t{nd!r}\t{pw}\t{ws}\t{fs}\t{ms}\t{cr}{tail}"
+                         for rid, a, sp, nd, pw, ws, fs, ms, cr in zip(rids, *indicator_columns(values))))
+
+    cri = values["cri"].ravel()
+    with cur.copy("COPY alerts (run_id, region_id, domain, severity, title, message, details, valid_start_utc, valid_end_utc, created_utc) FROM STDIN") as cp:
+        cp.set_types(["int8", "text", "text", "int4", "text", "text", "jsonb", "timestamptz", "timestamptz", "timestamptz"])
+        for k in alert_cells(values).tolist():
+            sev = int(cri[k])
+            cp.write_row((run_db_id, rids[k], ALERT_DOMAIN, sev, alert_title(sev), ALERT_MESSAGE,
+                          alert_details(values, k, confidence), valid_start, valid_end, now))
+
+def upsert_latest(cur, run_db_id, confidence):
+    """Point latest_indicators at this run's rows, set-based from what the writer just stored.
+
+    DISTINCT ON guards against grids whose cells share a region id; the
+    run_id filter is served by idx_indicators_wide_run in each partition.
+    """
+    cur.execute("""
+        INSERT INTO latest_indicators(region_id, run_id, updated_utc, confidence, rain_anom, soil_pct, ndvi_anom, persistence_wk, wsi, fsi, msi, cri)
+        SELECT DISTINCT ON (region_id) region_id, run_id, updated_utc, %s, rain_anom, soil_pct, ndvi_anom, persistence_wk, wsi, fsi, msi, cri
+        FROM indicators_wide WHERE run_id=%s
+        ORDER BY region_id
+        ON CONFLICT (region_id) DO UPDATE SET
+          run_id=EXCLUDED.run_id, updated_utc=EXCLUDED.updated_utc, confidence=EXCLUDED.confidence,
+          rain_anom=EXCLUDED.rain_anom, soil_pct=EXCLUDED.soil_pct, ndvi_anom=EXCLUDED.ndvi_anom,
+          persistence_wk=EXCLUDED.persistence_wk, wsi=EXCLUDED.wsi, fsi=EXCLUDED.fsi, msi=EXCLUDED.msi, cri=EXCLUDED.cri
+        WHERE latest_indicators.updated_utc <= EXCLUDED.updated_utc""", (confidence, run_db_id))
+
+def restore_latest(cur):
+    """Refill latest_indicators for regions whose latest run was deleted (rows cascade away).
+
+    No service deletes runs; after a manual ``DELETE FROM runs`` this is called by
+    ``python -m worker.retention``. Each missing region is one probe of
+    idx_indicators_wide_region, so it stays cheap when nothing is missing.
+    """
+    cur.execute("""
+        INSERT INTO latest_indicators(region_id, run_id, updated_utc, confidence, rain_anom, soil_pct, ndvi_anom, persistence_wk, wsi, fsi, msi, cri)
+        SELECT w.region_id, w.run_id, w.updated_utc, r.confidence,
+               w.rain_anom, w.soil_pct, w.ndvi_anom, w.persistence_wk, w.wsi, w.fsi, w.msi, w.cri
+        FROM regions g
+        CROSS JOIN LATERAL (SELECT * FROM indicators_wide w WHERE w.region_id = g.region_id
+                            ORDER BY w.updated_utc DESC LIMIT 1) w
+        JOIN runs r ON r.id = w.run_id
+        WHERE NOT EXISTS (SELECT 1 FROM latest_indicators l WHERE l.region_id = g.region_id)
+        ON CONFLICT (region_id) DO NOTHING""")
+    return cur.rowcount
+
+# persist mode -> (region upsert, run writer)
+WRITERS = {"rows": (upsert_regions_rows, write_rows), "copy": (upsert_regions_copy, write_copy)}